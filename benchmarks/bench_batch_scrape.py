@@ -0,0 +1,50 @@
+"""Measure batch scraping throughput against the local fake Headway site.
+
+Runs the same list of books with an increasing number of workers and prints
+books/min for each. Needs Chrome and ChromeDriver like the app itself.
+
+Usage: python benchmarks/bench_batch_scrape.py [--books 8] [--pages 6] [--workers 1 2 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_headway import start_server
+from utils.batch_scrape import scrape_books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=6)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    server, base_url = start_server(pages=args.pages, latency=args.latency)
+    # Checkpoints, cookies and books are written relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_batch_"))
+    rows = []
+    for workers in args.workers:
+        urls = [f"{base_url}/books/w{workers}-book{i}/summary" for i in range(args.books)]
+        start = time.perf_counter()
+        results = scrape_books("bench@example.com", "secret", urls, workers=workers,
+                               min_interval=0.0, retries=1)
+        elapsed = time.perf_counter() - start
+        failed = sum(isinstance(r, Exception) for r in results.values())
+        rows.append((workers, elapsed, args.books * 60 / elapsed, failed))
+
+    print(f"\n{'workers':>8} {'seconds':>9} {'books/min':>10} {'failed':>7}")
+    for workers, elapsed, rate, failed in rows:
+        print(f"{workers:>8} {elapsed:>9.2f} {rate:>10.1f} {failed:>7}")
+    print(f"Server handled {server.requests} requests, {server.logins} logins")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
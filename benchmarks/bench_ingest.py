@@ -0,0 +1,134 @@
+"""Measure EPUB, HTML and Markdown ingestion throughput on generated fixtures.
+
+Writes a large EPUB (many XHTML chapters), one large HTML file and one
+large Markdown file, then reports MB/s of markup and words/s for each, the
+EPUB both inline and with the process pool, and the time until the first
+words reach the tokenizer.
+
+Usage: python benchmarks/bench_ingest.py [--mb 20] [--chapters 60] [--workers 0 2 4]
+"""
+import argparse
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.ingest import ingest, iter_text
+from utils.text_processor import TextProcessor
+
+WORDS = ("the of and to a in is it that reading speed comprehension chapter eye movement "
+         "practice extraordinary naïve understanding question however").split()
+
+CONTAINER = ('<?xml version="1.0"?><container version="1.0" '
+             'xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+             '<rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+             '</rootfiles></container>')
+
+
+def paragraphs(rng, size):
+    """Yield sentences of random words until about size characters were produced"""
+    length = 0
+    while length < size:
+        paragraph = " ".join(rng.choices(WORDS, k=rng.randint(40, 120))) + "."
+        length += len(paragraph)
+        yield paragraph
+
+
+def chapter_html(rng, size, number):
+    body = "".join(f"<p>{p.replace('speed', '<em>speed</em>')}</p>\n" for p in paragraphs(rng, size))
+    return (f'<?xml version="1.0" encoding="utf-8"?><html xmlns="http://www.w3.org/1999/xhtml">'
+            f'<head><title>Chapter {number}</title><style>p {{ margin: 0 }}</style></head>'
+            f'<body><h1>Chapter {number}</h1>\n{body}</body></html>')
+
+
+def write_epub(path, size, chapters, rng):
+    manifest = "".join(f'<item id="c{i}" href="text/c{i}.xhtml" media-type="application/xhtml+xml"/>'
+                       for i in range(chapters))
+    spine = "".join(f'<itemref idref="c{i}"/>' for i in range(chapters))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as book:
+        book.writestr('mimetype', 'application/epub+zip', zipfile.ZIP_STORED)
+        book.writestr('META-INF/container.xml', CONTAINER)
+        book.writestr('OEBPS/content.opf',
+                      f'<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="3.0">'
+                      f'<manifest>{manifest}</manifest><spine>{spine}</spine></package>')
+        for i in range(chapters):
+            book.writestr(f'OEBPS/text/c{i}.xhtml', chapter_html(rng, size // chapters, i))
+
+
+def write_markdown(path, size, rng):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, paragraph in enumerate(paragraphs(rng, size)):
+            if i % 50 == 0:
+                f.write(f"## Section {i // 50}\n\n")
+            f.write(paragraph.replace("speed", "**speed**").replace("chapter", "[chapter](#c)") + "\n\n")
+
+
+def markup_mb(path):
+    if path.suffix == '.epub':
+        with zipfile.ZipFile(path) as book:
+            return sum(info.file_size for info in book.infolist()) / 1e6
+    return path.stat().st_size / 1e6
+
+
+def measure(path, workers=None):
+    """Return (seconds, words, seconds to the first tokenized word)"""
+    processor = TextProcessor()
+    pages = queue.Queue()
+    start = time.perf_counter()
+    processor.stream_pages(pages)
+    feeder = threading.Thread(target=ingest, args=(path, pages, workers))
+    feeder.start()
+    processor.wait_for_words(1)
+    first = time.perf_counter() - start
+    processor.wait_until_complete()
+    elapsed = time.perf_counter() - start
+    feeder.join()
+    return elapsed, processor.word_count(), first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mb', type=float, default=20, help="approximate text size of each fixture")
+    parser.add_argument('--chapters', type=int, default=60)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2, 4],
+                        help="EPUB process pool sizes to try (0 parses inline)")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    size = int(args.mb * 1e6)
+    workdir = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+    epub = workdir / "book.epub"
+    html = workdir / "book.html"
+    markdown = workdir / "book.md"
+    start = time.perf_counter()
+    write_epub(epub, size, args.chapters, rng)
+    with open(html, 'w', encoding='utf-8') as f:
+        f.write(chapter_html(rng, size, 1))
+    write_markdown(markdown, size, rng)
+    print(f"Fixtures written to {workdir} in {time.perf_counter() - start:.1f}s "
+          f"({os.cpu_count()} CPUs)\n")
+
+    print(f"{'source':<22}{'MB':>8}{'seconds':>10}{'MB/s':>9}{'words/s':>12}{'first ms':>10}")
+    runs = [(f"epub workers={w}", epub, w) for w in args.workers]
+    runs += [("html", html, None), ("markdown", markdown, None)]
+    for name, path, workers in runs:
+        elapsed, words, first = measure(path, workers)
+        mb = markup_mb(path)
+        print(f"{name:<22}{mb:>8.1f}{elapsed:>10.2f}{mb / elapsed:>9.1f}{words / elapsed:>12,.0f}{first * 1000:>10.1f}")
+
+    # Extraction alone, without the tokenizer
+    start = time.perf_counter()
+    chars = sum(len(piece) for piece in iter_text(html))
+    elapsed = time.perf_counter() - start
+    print(f"\nhtml extraction only: {markup_mb(html) / elapsed:.1f} MB/s, {chars / 1e6:.1f}M chars of text")
+
+
+if __name__ == "__main__":
+    main()
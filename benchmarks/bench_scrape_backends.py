@@ -0,0 +1,75 @@
+"""Compare the HTTP and Selenium scrape backends against the fake Headway site.
+
+Reports seconds per book, requests per book and memory for each backend.
+Memory is the Python heap peak plus, for Selenium, the peak RSS of the
+browser processes. The Selenium run is skipped if Selenium or ChromeDriver
+is missing.
+
+Usage: python benchmarks/bench_scrape_backends.py [--books 3] [--pages 12] [--latency 0.02]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_headway import start_server
+
+
+def run_backend(backend, base_url, server, books):
+    from utils.scrape import get_session_pool, scrape_headway_book
+
+    requests_before = server.requests
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(books):
+        scrape_headway_book("bench@example.com", "secret",
+                            f"{base_url}/books/{backend}-book{i}/summary", backend=backend)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    get_session_pool(base_url).close_all()
+    # Browser processes are children; their peak RSS is only known once they exited
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        'seconds_per_book': elapsed / books,
+        'requests_per_book': (server.requests - requests_before) / books,
+        'python_peak_mb': peak / 1e6,
+        'browser_peak_mb': children_kb / 1e3 if backend == "selenium" else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, base_url = start_server(pages=args.pages, latency=args.latency)
+    os.chdir(tempfile.mkdtemp(prefix="bench_backends_"))
+
+    results = {}
+    for backend in ("http", "selenium"):
+        try:
+            results[backend] = run_backend(backend, base_url, server, args.books)
+        except Exception as e:
+            print(f"Skipping {backend}: {str(e)}")
+
+    print(f"\n{'backend':>9} {'s/book':>8} {'req/book':>9} {'py MB':>7} {'browser MB':>11}")
+    for backend, r in results.items():
+        print(f"{backend:>9} {r['seconds_per_book']:>8.3f} {r['requests_per_book']:>9.1f} "
+              f"{r['python_peak_mb']:>7.1f} {r['browser_peak_mb']:>11.1f}")
+    if len(results) == 2:
+        print(f"HTTP is {results['selenium']['seconds_per_book'] / results['http']['seconds_per_book']:.1f}x "
+              f"faster per book")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
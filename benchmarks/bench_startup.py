@@ -0,0 +1,60 @@
+"""Measure module import cost at startup with python -X importtime.
+
+Checks that the GUI entry point does not load selenium or the file dialogs,
+and that the headless speedreader entry point does not load tkinter.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# entry point -> module prefixes it must not import
+ENTRY_POINTS = {
+    'main': ('selenium', 'tkinter.filedialog', 'tkinter.messagebox', 'utils.scrape'),
+    'speedreader': ('tkinter', 'selenium', 'utils.scrape'),
+}
+
+
+def import_times(module):
+    """Return {module: (self_us, cumulative_us)} for a fresh interpreter importing module"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=SRC, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for entry, forbidden in ENTRY_POINTS.items():
+        runs = [import_times(entry) for _ in range(args.runs)]
+        totals = sorted(times[entry][1] for times in runs)
+        print(f"\n{entry}: median {totals[len(totals) // 2] / 1000:.1f} ms "
+              f"(min {totals[0] / 1000:.1f} ms) over {args.runs} runs, {len(runs[-1])} modules")
+        for name, (_, cumulative) in sorted(runs[-1].items(), key=lambda item: -item[1][1])[1:args.top + 1]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+        loaded = sorted(name for name in runs[-1] if name.startswith(forbidden))
+        if loaded:
+            failed = True
+            print(f"  FAIL: loads {', '.join(loaded)}")
+        else:
+            print(f"  OK: does not load {', '.join(forbidden)}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
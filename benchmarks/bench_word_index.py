@@ -0,0 +1,80 @@
+"""Compare the array-backed word index with a plain list of words.
+
+Usage: python benchmarks/bench_word_index.py [--words 10000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.text_processor import TextProcessor
+
+VOCABULARY = ["the", "of", "and", "reading", "speed", "comprehension", "a", "to",
+              "chapter.", "words,", "eye", "movement", "practice", "in", "is"]
+
+
+def make_corpus(word_count, seed=1):
+    rng = random.Random(seed)
+    words = rng.choices(VOCABULARY, k=word_count)
+    # Sprinkle in paragraph breaks so the whitespace is not uniform
+    for i in range(0, word_count, 120):
+        words[i] = "\n\n" + words[i]
+    return " ".join(words)
+
+
+def measure(build):
+    """Return (result, seconds, retained bytes, peak bytes); memory is traced in a separate run"""
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+
+def seek_time(words, count, seed=2):
+    rng = random.Random(seed)
+    indices = [rng.randrange(len(words)) for _ in range(count)]
+    start = time.perf_counter()
+    for i in indices:
+        words[i]
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=10_000_000)
+    parser.add_argument('--seeks', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.words:,} word corpus...")
+    text = make_corpus(args.words)
+
+    words, list_time, list_mem, list_peak = measure(lambda: text.split())
+    list_seek = seek_time(words, args.seeks)
+    del words
+
+    def build_index():
+        processor = TextProcessor()
+        processor.set_text(text)
+        return processor
+
+    processor, index_time, index_mem, index_peak = measure(build_index)
+    index_seek = seek_time(processor.get_words(), args.seeks)
+
+    n = processor.word_count()
+    print(f"{'':16}{'build s':>10}{'bytes/word':>12}{'peak MB':>10}{'seek us':>10}")
+    print(f"{'list of str':16}{list_time:10.2f}{list_mem / n:12.1f}{list_peak / 2**20:10.0f}{list_seek * 1e6:10.2f}")
+    print(f"{'offset index':16}{index_time:10.2f}{index_mem / n:12.1f}{index_peak / 2**20:10.0f}{index_seek * 1e6:10.2f}")
+    print(f"Per-word memory reduced {list_mem / max(index_mem, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
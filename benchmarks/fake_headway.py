@@ -0,0 +1,137 @@
+"""Local stand-in for the Headway login and summary pages.
+
+Serves just enough of the real markup for utils/scrape.py: a login form,
+summary pages with the content selector and a next-page button. Books are
+generated on the fly, so any /books/<name>/summary URL works.
+
+Usage: python benchmarks/fake_headway.py [--port 8765] [--pages 12] [--latency 0.05]
+"""
+import argparse
+import html
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LOGIN_PAGE = """<!doctype html>
+<html><body>
+<form method="post" action="/login">
+  <input name="email" type="email">
+  <input name="password" type="password">
+  <button type="submit">Log in</button>
+</form>
+</body></html>"""
+
+SUMMARY_PAGE = """<!doctype html>
+<html><body>
+<div class="MuiStack-root mui-style-mhauuz">{content}</div>
+{next_button}
+</body></html>"""
+
+NEXT_BUTTON = """<button class="MuiButtonBase-root MuiButton-root" onclick="location.href='?page={page}'">
+  <svg viewBox="0 0 24 24"><path d="M16.6141 11.2L9.4 4"></path></svg>
+</button>"""
+
+PARAGRAPH = ("Speed reading is a collection of techniques that aim to raise the rate "
+             "of reading without losing comprehension. ")
+
+
+class FakeHeadwayHandler(BaseHTTPRequestHandler):
+    server_version = "FakeHeadway/1.0"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body="", headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _logged_in(self):
+        cookies = self.headers.get('Cookie', '')
+        for part in cookies.split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == 'session' and value in self.server.sessions:
+                return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests += 1
+        if url.path == '/login':
+            self._send(200, LOGIN_PAGE)
+            return
+        if not self._logged_in():
+            self._send(302, headers={'Location': '/login'})
+            return
+        parts = url.path.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'books' and parts[2] == 'summary':
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            self._send_summary(parts[1], page)
+        else:
+            self._send(200, "<html><body>Library</body></html>")
+
+    def do_POST(self):
+        self.server.requests += 1
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if urlparse(self.path).path != '/login' or not form.get('email'):
+            self._send(400, "Bad request")
+            return
+        self.server.logins += 1
+        token = uuid.uuid4().hex
+        self.server.sessions.add(token)
+        self._send(302, headers={'Location': '/', 'Set-Cookie': f'session={token}; Path=/'})
+
+    def _send_summary(self, book, page):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        pages = self.server.pages
+        page = max(1, min(page, pages))
+        content = html.escape(f"{book} page {page}. ") + PARAGRAPH * self.server.paragraph_repeat
+        next_button = NEXT_BUTTON.format(page=page + 1) if page < pages else ""
+        self._send(200, SUMMARY_PAGE.format(content=content, next_button=next_button))
+
+
+def start_server(port=0, pages=12, latency=0.0, paragraph_repeat=20):
+    """Start the fake site on a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeHeadwayHandler)
+    server.daemon_threads = True
+    server.pages = pages
+    server.latency = latency
+    server.paragraph_repeat = paragraph_repeat
+    server.sessions = set()
+    server.logins = 0
+    server.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+    server, base_url = start_server(args.port, args.pages, args.latency)
+    print(f"Fake Headway running at {base_url} (e.g. {base_url}/books/demo/summary)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
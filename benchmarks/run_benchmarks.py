@@ -0,0 +1,410 @@
+"""Reproducible benchmark suite with machine-readable results.
+
+Covers tokenizing synthetic corpora (1 KB to 100 MB) in memory and from
+files, the reading scheduler's timing error at 300-3000 WPM with a
+headless display callback, 1,000 concurrent 1000 WPM sessions on the
+shared scheduler thread, the save/restore round trip and the index
+cache, full-text search, word frequency lookups for pacing, and scrape
+throughput against the local fake Headway site.
+
+Results are written as JSON; pass --compare with an earlier result file to
+see the change of every metric.
+
+Usage: python benchmarks/run_benchmarks.py [--quick] [--only tokenize scheduler sessions search]
+                                           [--output results.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+import threading
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.scheduler import ReadingScheduler
+from controllers.speed_controller import SpeedController
+from controllers.telemetry import PresentationTelemetry
+from utils.book_cache import BookCache
+from utils.lexicon import Lexicon, build_lexicon
+from utils.progress_store import ProgressStore
+from utils.search_index import SearchIndex
+from utils.text_processor import TextProcessor
+from utils.timing import build_weights
+
+SIZES = {'1KB': 1 << 10, '100KB': 100 << 10, '1MB': 1 << 20, '10MB': 10 << 20, '100MB': 100 << 20}
+QUICK_SIZES = ['1KB', '100KB', '1MB']
+WPMS = [300, 600, 1000, 2000, 3000]
+
+VOCABULARY = ("the of and to a in is it that reading speed comprehension chapter eye "
+              "movement practice extraordinary subvocalization, words. however; "
+              "understanding! question? “quoted” naïve").split()
+
+
+def make_corpus(size, seed=1):
+    """Return about size characters of text with sentences and paragraphs"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        words = rng.choices(VOCABULARY, k=rng.randint(40, 160))
+        paragraph = " ".join(words) + ".\n\n"
+        parts.append(paragraph)
+        length += len(paragraph)
+    return "".join(parts)[:size]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def timed(function, repeat):
+    """Best wall time of repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def traced_peak(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_tokenize(sizes, workdir):
+    results = {}
+    for name in sizes:
+        text = make_corpus(SIZES[name])
+        path = Path(workdir) / f"corpus_{name}.txt"
+        path.write_text(text, encoding='utf-8')
+        repeat = 5 if SIZES[name] <= 1 << 20 else 1
+        processor = TextProcessor()
+
+        def from_file():
+            processor.stream_text(path)
+            processor.wait_until_complete()
+
+        seconds = timed(lambda: processor.set_text(text), repeat)
+        words = processor.word_count()
+        results[name] = {
+            'words': words,
+            'set_text_s': seconds,
+            'words_per_s': words / seconds,
+            'file_s': timed(from_file, repeat),
+            'peak_mb': traced_peak(lambda: processor.set_text(text)) / 1e6,
+        }
+        print(f"tokenize {name:>6}: {words:>10} words, {seconds:.4f}s, "
+              f"{results[name]['peak_mb']:.1f} MB peak")
+        path.unlink()
+    return results
+
+
+def bench_scheduler(wpms, seconds):
+    results = {}
+    processor = TextProcessor()
+    processor.set_text(make_corpus(200_000))
+    # Sessions adopt a schedule built in the background on a later word;
+    # build it first so every variable run is timed against it from word one
+    processor.get_schedule()
+    for wpm in wpms:
+        for pace in ('fixed', 'variable'):
+            shown = []
+            controller = SpeedController(processor, lambda word: shown.append(time.perf_counter()))
+            controller.pace_mode = pace
+            controller.set_speed(60000 / wpm)
+            controller.start_reading()
+            time.sleep(seconds)
+            controller.stop_reading()
+            # Compare every display time with the deadline the schedule gave it
+            schedule = processor.get_schedule() if pace == 'variable' else None
+            interval_ms = 60000.0 / wpm
+            errors = []
+            jitter = []
+            for i, actual in enumerate(shown):
+                slot = schedule.offset(i) if schedule else i
+                errors.append((actual - shown[0]) * 1000 - slot * interval_ms)
+                if i:
+                    # Error of each gap against that word's own duration
+                    expected = (schedule.weight(i - 1) if schedule else 1.0) * interval_ms
+                    jitter.append(abs((actual - shown[i - 1]) * 1000 - expected))
+            stats = controller.get_pace_stats()
+            results[f"{wpm}_{pace}"] = {
+                'words': len(shown),
+                'achieved_wpm': stats['achieved_wpm'],
+                'drift_ms': errors[-1],
+                'error_p50_ms': percentile([abs(e) for e in errors], 0.5),
+                'error_p99_ms': percentile([abs(e) for e in errors], 0.99),
+                'jitter_p50_ms': percentile(jitter, 0.5) if jitter else 0.0,
+                'jitter_p99_ms': percentile(jitter, 0.99) if jitter else 0.0,
+            }
+            r = results[f"{wpm}_{pace}"]
+            print(f"scheduler {wpm:>5} WPM {pace:>8}: {r['achieved_wpm']:.0f} achieved, "
+                  f"jitter p50 {r['jitter_p50_ms']:.2f} ms, p99 {r['jitter_p99_ms']:.2f} ms")
+    return results
+
+
+def bench_sessions(count, seconds, wpm=1000):
+    """Run count sessions of one book at once on a single scheduler thread"""
+    processor = TextProcessor()
+    processor.set_text(make_corpus(200_000))
+    processor.get_schedule()
+    scheduler = ReadingScheduler("bench-sessions")
+    frames = [0]
+
+    def show(word):
+        frames[0] += 1
+
+    controllers = []
+    for i in range(count):
+        controller = SpeedController(processor, show, scheduler)
+        controller.telemetry = PresentationTelemetry(capacity=1024)
+        controller.set_speed(60000 / wpm)
+        controllers.append(controller)
+    for controller in controllers:
+        controller.start_reading()
+    # Let every session get going before counting
+    time.sleep(min(1.0, seconds / 4))
+    steps_start = scheduler.steps
+    process_start = time.process_time()
+    start = time.perf_counter()
+    time.sleep(seconds)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - process_start
+    steps = scheduler.steps - steps_start
+    for controller in controllers:
+        controller.stop_reading()
+    scheduler.close()
+
+    interval_ms = 60000.0 / wpm
+    lateness = []
+    missed = 0
+    for controller in controllers:
+        for scheduled, actual, _ in controller.telemetry.samples():
+            late = (actual - scheduled) * 1000
+            lateness.append(late)
+            # A word shown when the next one is already due missed its slot
+            if late > interval_ms:
+                missed += 1
+    achieved = statistics.mean(c.get_pace_stats()['achieved_wpm'] for c in controllers)
+    result = {
+        'sessions': count,
+        'wpm': wpm,
+        'frames_per_s': steps / elapsed,
+        'cpu_share': cpu / elapsed,
+        'achieved_wpm': achieved,
+        'lateness_p50_ms': percentile(lateness, 0.5),
+        'lateness_p99_ms': percentile(lateness, 0.99),
+        'lateness_max_ms': max(lateness),
+        'missed_deadlines': missed,
+        'threads': threading.active_count(),
+    }
+    print(f"sessions {count} x {wpm} WPM: {result['frames_per_s']:,.0f} frames/s, "
+          f"{result['cpu_share'] * 100:.0f}% CPU, lateness p50 {result['lateness_p50_ms']:.2f} ms, "
+          f"p99 {result['lateness_p99_ms']:.2f} ms, max {result['lateness_max_ms']:.2f} ms, "
+          f"{missed} missed")
+    return result
+
+
+def bench_saves(workdir, repeat=200):
+    """The legacy saves/ JSON round trip, the progress store and the index cache"""
+    saves_dir = Path(workdir) / "saves"
+    saves_dir.mkdir(exist_ok=True)
+    save_file = saves_dir / "book_save.json"
+    save_data = {'position': 123456, 'timestamp': str(time.time()), 'file_path': "books/book.txt"}
+
+    def save():
+        with open(save_file, 'w', encoding='utf-8') as f:
+            json.dump(save_data, f, indent=4)
+
+    def restore():
+        with open(save_file, 'r', encoding='utf-8') as f:
+            return json.load(f)['position']
+
+    save_times = [timed(save, 1) for _ in range(repeat)]
+    restore_times = [timed(restore, 1) for _ in range(repeat)]
+
+    # A library of a few thousand books in the progress store
+    store = ProgressStore(saves_dir / "progress.db", debounce=0.05, legacy_dir=workdir)
+    paths = [f"books/book{i}.txt" for i in range(5000)]
+    checkpoint_s = timed(lambda: [store.checkpoint(p, i) for i, p in enumerate(paths)], 1) / len(paths)
+    store.flush()
+    lookup_times = [timed(lambda: store.lookup(paths[i * 7 % len(paths)]), 1) for i in range(repeat)]
+    store.close()
+
+    processor = TextProcessor()
+    processor.set_text(make_corpus(10 << 20))
+    cache = BookCache(Path(workdir) / "cache")
+    key = cache.key_for(processor.buffer)
+    store_s = timed(lambda: cache.store(key, *processor.get_index()), 3)
+    load_s = timed(lambda: cache.load(key), 20)
+    results = {
+        'save_p50_ms': statistics.median(save_times) * 1000,
+        'save_p99_ms': percentile(save_times, 0.99) * 1000,
+        'restore_p50_ms': statistics.median(restore_times) * 1000,
+        'restore_p99_ms': percentile(restore_times, 0.99) * 1000,
+        'progress_checkpoint_us': checkpoint_s * 1e6,
+        'progress_lookup_p50_ms': statistics.median(lookup_times) * 1000,
+        'index_store_10MB_ms': store_s * 1000,
+        'index_load_10MB_ms': load_s * 1000,
+    }
+    print(f"saves: save p50 {results['save_p50_ms']:.3f} ms, restore p50 {results['restore_p50_ms']:.3f} ms, "
+          f"10MB index store {results['index_store_10MB_ms']:.1f} ms, load {results['index_load_10MB_ms']:.3f} ms")
+    return results
+
+
+def bench_search(workdir, size=10 << 20, repeat=20):
+    """Build, save and load the inverted index, and query it"""
+    processor = TextProcessor()
+    processor.set_text(make_corpus(size))
+    build_s = timed(lambda: SearchIndex.build(processor), 1)
+    index = SearchIndex.build(processor)
+    path = Path(workdir) / "book.sidx"
+    index.save(path)
+    load_s = timed(lambda: SearchIndex.load(path, processor.word_count()), 5)
+    results = {
+        'words': processor.word_count(),
+        'build_s': build_s,
+        'load_ms': load_s * 1000,
+        'index_mb': (len(index.postings) + len(index.offsets)) * index.postings.itemsize / 1e6,
+    }
+    for name, query in (('term', "extraordinary"), ('prefix', "under*"), ('phrase', "eye movement practice")):
+        results[f'{name}_query_ms'] = timed(lambda: index.find(query), repeat) * 1000
+    print(f"search: {results['words']} words indexed in {build_s:.2f}s, load {results['load_ms']:.1f} ms, "
+          f"phrase query {results['phrase_query_ms']:.1f} ms")
+    return results
+
+
+def bench_lexicon(workdir, words=1_000_000, lexicon_words=150_000, seed=1):
+    """Pace weights of a book with a realistic vocabulary, with and without a lexicon"""
+    rng = random.Random(seed)
+    vocabulary = list(dict.fromkeys(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12)))
+                                    for _ in range(lexicon_words + 20000)))
+    path = Path(workdir) / "lexicon.bin"
+    build_s = timed(lambda: build_lexicon({w: lexicon_words * 100 // (r + 1) + 1
+                                           for r, w in enumerate(vocabulary[:lexicon_words])}, path), 1)
+    # Zipf-distributed text over the 60k most common words plus some unknown ones
+    common = vocabulary[:60000] + vocabulary[lexicon_words:]
+    ranks = [1 / (r + 1) for r in range(60000)] + [1e-5] * (len(common) - 60000)
+    processor = TextProcessor()
+    processor.set_text(" ".join(rng.choices(common, weights=ranks, k=words)))
+    distinct = set(processor.get_words())
+    lookup_s = timed(lambda: Lexicon(path).multipliers(distinct), 3)
+    results = {
+        'words': processor.word_count(),
+        'distinct_words': len(distinct),
+        'lexicon_mb': path.stat().st_size / 1e6,
+        'lexicon_build_s': build_s,
+        'lexicon_open_ms': timed(lambda: Lexicon(path).available(), 5) * 1000,
+        'lookup_s': lookup_s,
+        'weights_s': timed(lambda: build_weights(processor), 1),
+        'weights_with_lexicon_s': timed(lambda: build_weights(processor, lexicon=Lexicon(path)), 1),
+    }
+    print(f"lexicon: {len(distinct)} distinct of {results['words']} words looked up in {lookup_s:.2f}s, "
+          f"weights {results['weights_s']:.2f}s -> {results['weights_with_lexicon_s']:.2f}s with lexicon")
+    return results
+
+
+def bench_scrape(workdir, books=3, pages=12):
+    from fake_headway import start_server
+    from utils.scrape import scrape_headway_book
+
+    server, base_url = start_server(pages=pages)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        for i in range(books):
+            scrape_headway_book("bench@example.com", "secret",
+                                f"{base_url}/books/suite{i}/summary", backend="http")
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+    results = {
+        'backend': 'http',
+        'books_per_min': books * 60 / elapsed,
+        'pages_per_s': books * pages / elapsed,
+        'requests': server.requests,
+    }
+    print(f"scrape: {results['pages_per_s']:.1f} pages/s over HTTP")
+    return results
+
+
+def compare(old, new, path=()):
+    """Print the relative change of every numeric metric present in both results"""
+    for key, value in new.items():
+        if key not in old:
+            continue
+        if isinstance(value, dict):
+            compare(old[key], value, path + (key,))
+        elif isinstance(value, (int, float)) and isinstance(old[key], (int, float)) and old[key]:
+            change = (value - old[key]) / abs(old[key]) * 100
+            print(f"{'.'.join(path + (key,)):50} {old[key]:>12.4g} -> {value:>12.4g} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help="small corpora and short scheduler runs")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES))
+    parser.add_argument('--wpm', type=int, nargs='+', default=WPMS)
+    parser.add_argument('--seconds', type=float, default=3.0, help="scheduler run per WPM")
+    parser.add_argument('--sessions', type=int, default=1000, help="concurrent sessions to run")
+    parser.add_argument('--only', nargs='+',
+                        choices=['tokenize', 'scheduler', 'sessions', 'saves', 'search', 'lexicon', 'scrape'])
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--compare', help="earlier result file")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else list(SIZES))
+    seconds = 1.0 if args.quick else args.seconds
+    only = set(args.only or ['tokenize', 'scheduler', 'sessions', 'saves', 'search', 'lexicon', 'scrape'])
+    workdir = tempfile.mkdtemp(prefix="speedreader_bench_")
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+    }
+    if 'tokenize' in only:
+        results['tokenize'] = bench_tokenize(sizes, workdir)
+    if 'scheduler' in only:
+        results['scheduler'] = bench_scheduler(args.wpm, seconds)
+    if 'sessions' in only:
+        results['sessions'] = bench_sessions(args.sessions, 2 * seconds)
+    if 'saves' in only:
+        results['saves'] = bench_saves(workdir)
+    if 'search' in only:
+        results['search'] = bench_search(workdir)
+    if 'lexicon' in only:
+        results['lexicon'] = bench_lexicon(workdir)
+    if 'scrape' in only:
+        results['scrape'] = bench_scrape(workdir)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
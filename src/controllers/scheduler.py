@@ -0,0 +1,137 @@
+import heapq
+import itertools
+import threading
+import time
+
+# Marks the session whose step is running in the pending map
+_RUNNING = -1
+
+
+class ReadingScheduler:
+    """One thread that drives any number of reading sessions.
+
+    Sessions are kept in a heap ordered by the perf_counter time of their
+    next step. A session's step(now) shows one frame and returns the time
+    of its next step, or None when it is done. Every session has at most
+    one pending step: schedule() replaces it and cancel() drops it, and
+    both wait for a step of that session that is running right now, so no
+    step of a cancelled session runs after cancel() returns. Steps run on
+    the scheduler thread and must never block.
+    """
+    def __init__(self, name="reading-scheduler"):
+        self.name = name
+        self._heap = []
+        # session -> sequence number of its pending heap entry; other
+        # entries of the session are stale and skipped when popped
+        self._pending = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        # Session whose step is running; steps run outside the lock, so
+        # schedule() and cancel() can get in between steps that are behind
+        self._running = None
+        self._thread = None
+        self._closed = False
+        self.steps = 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _wait_for_step(self, session):
+        """Wait until no step of session is running, unless it is the caller"""
+        while self._running is session and threading.current_thread() is not self._thread:
+            self._cond.wait()
+
+    def schedule(self, session, when=None):
+        """Run session.step at perf_counter time `when` (default: now)"""
+        if when is None:
+            when = time.perf_counter()
+        with self._cond:
+            self._wait_for_step(session)
+            seq = next(self._counter)
+            self._pending[session] = seq
+            heapq.heappush(self._heap, (when, seq, session))
+            self._ensure_thread()
+            # Wake the thread if this is now the earliest step
+            if self._heap[0][1] == seq:
+                self._cond.notify_all()
+
+    def cancel(self, session):
+        with self._cond:
+            self._pending.pop(session, None)
+            self._wait_for_step(session)
+            # Drop the step a running step may have scheduled for itself
+            self._pending.pop(session, None)
+
+    def is_scheduled(self, session):
+        with self._cond:
+            return session in self._pending
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        heap = self._heap
+        pending = self._pending
+        with self._cond:
+            while not self._closed:
+                if not heap:
+                    self._cond.wait()
+                    continue
+                when, seq, session = heap[0]
+                if pending.get(session) != seq:
+                    heapq.heappop(heap)
+                    continue
+                now = time.perf_counter()
+                if when > now:
+                    self._cond.wait(when - now)
+                    continue
+                heapq.heappop(heap)
+                pending[session] = _RUNNING
+                self._running = session
+                self.steps += 1
+                self._cond.release()
+                try:
+                    next_step = session.step(now)
+                except Exception as e:
+                    print(f"Reading session stopped: {str(e)}")
+                    next_step = None
+                finally:
+                    self._cond.acquire()
+                self._running = None
+                self._cond.notify_all()
+                # A step that scheduled or cancelled its own session, or a
+                # schedule() or cancel() made while it ran, wins
+                if pending.get(session) == _RUNNING:
+                    if next_step is None:
+                        del pending[session]
+                    else:
+                        seq = next(self._counter)
+                        pending[session] = seq
+                        heapq.heappush(heap, (next_step, seq, session))
+
+    def close(self):
+        """Drop all sessions and stop the thread"""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """The scheduler shared by all SpeedControllers that were not given one"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ReadingScheduler()
+        return _default
@@ -1,35 +1,283 @@
 import time
 import threading
+from bisect import bisect_right
+
+from controllers.scheduler import default_scheduler
+from controllers.telemetry import PresentationTelemetry
+
+# Seconds between checks for more words while a streaming tokenizer is behind
+WORD_WAIT = 0.02
 
 class SpeedController:
-    def __init__(self, text_processor, display_callback):
+    def __init__(self, text_processor, display_callback, scheduler=None):
         self.text_processor = text_processor
         self.display_callback = display_callback
         self.speed = 200
         self.is_running = False
         self.current_position = 0
-        self.thread = None
+        # Frames are shown by step() on the thread of a ReadingScheduler,
+        # which all controllers share unless given their own. display_callback
+        # runs there too and must return quickly.
+        self.scheduler = scheduler if scheduler is not None else default_scheduler()
+
+        # 'deadline' schedules every word against an absolute monotonic clock,
+        # 'sleep' is the old fixed delay after each word
+        self.scheduler_mode = 'deadline'
+        # 'catch_up' shows late words back to back, 'skip' drops the missed ones
+        self.late_policy = 'catch_up'
+        # Lateness (in words) after which catch_up gives up and re-anchors
+        self.max_catch_up_words = 5
+        # 'variable' gives long words and sentence ends more time (see
+        # utils/timing.py) at the same average WPM, 'fixed' gives every word self.speed
+        self.pace_mode = 'variable'
+        # Show phrases of a few words per frame (see TextProcessor.chunk_end)
+        self.chunk_mode = False
+        # Scheduled vs actual display times of the deadline loop; None turns it off
+        self.telemetry = PresentationTelemetry()
+
+        # Counts sessions so a schedule built for an earlier one is ignored
+        self._session = 0
+        self._pending_seek = None
+        self._waiting = False
+        self._built_schedule = None
+        self._schedule_thread = None
+        self._anchor = 0.0
+        # Schedule offset of the word shown at _anchor, so a deadline needs one lookup
+        self._anchor_offset = 0.0
+        self._schedule = None
+        # When the first and latest frames went up, and how many words had
+        # been shown or skipped before the latest one
+        self._first_shown = None
+        self._last_shown = None
+        self._words_before_last = 0
+        self.words_shown = 0
+        self.words_skipped = 0
 
     def set_speed(self, speed):
         self.speed = speed
+        # Re-anchor so the new pace starts from the next word
+        if self.is_running:
+            self._rebase(time.perf_counter())
+
+    def _rebase(self, now):
+        self._anchor = now
+        schedule = self._schedule
+        self._anchor_offset = schedule.offset(self.current_position) if schedule else self.current_position
+
+    def seek(self, position):
+        """Continue reading at word position; while running the next step
+        picks it up at once and starts a fresh pace from there"""
+        last = self.text_processor.word_count() - 1
+        position = max(0, min(position, last)) if last >= 0 else 0
+        if self.is_running:
+            self._pending_seek = position
+            self.scheduler.schedule(self)
+        else:
+            self.current_position = position
+        return position
+
+    def shown_position(self):
+        """The word on screen: while running current_position is the next word"""
+        position = self._pending_seek if self._pending_seek is not None else self.current_position
+        if self.is_running and self._pending_seek is None:
+            position -= 1
+        return max(0, position)
+
+    def _step(self, starts, direction):
+        """Seek to the previous or next start in a sorted boundary array"""
+        position = self.shown_position()
+        i = bisect_right(starts, position) - 1
+        if direction < 0:
+            # Right after a start, go to the one before it instead
+            if i > 0 and position - starts[i] < 2:
+                i -= 1
+            target = starts[i] if i >= 0 else 0
+        else:
+            if i + 1 >= len(starts):
+                return self.current_position
+            target = starts[i + 1]
+        return self.seek(target)
+
+    def previous_sentence(self):
+        return self._step(self.text_processor.get_index()[1], -1)
+
+    def next_sentence(self):
+        return self._step(self.text_processor.get_index()[1], 1)
+
+    def previous_paragraph(self):
+        return self._step(self.text_processor.get_index()[2], -1)
+
+    def next_paragraph(self):
+        return self._step(self.text_processor.get_index()[2], 1)
+
+    def jump_to_percent(self, percent):
+        """Seek to the start of the sentence at percent of the book"""
+        position = int(self.text_processor.word_count() * max(0.0, min(percent, 100.0)) / 100)
+        sentences = self.text_processor.get_index()[1]
+        i = bisect_right(sentences, position) - 1
+        return self.seek(sentences[i] if i >= 0 else 0)
 
-    def reading_thread(self):
+    def _load_schedule(self):
+        """Pick up the variable pace schedule; returns True if it was just loaded.
+
+        A schedule that still has to be built is built on a helper thread,
+        so no step of any session waits for it; until then the pace is fixed.
+        """
+        if self.pace_mode != 'variable' or self._schedule is not None:
+            return False
+        # Available once the tokenizer is done
+        if not self.text_processor.is_complete():
+            return False
+        schedule = self.text_processor.cached_schedule() or self._built_schedule
+        if schedule is None:
+            if self._schedule_thread is None:
+                self._schedule_thread = threading.Thread(target=self._build_schedule,
+                                                         args=(self._session,), daemon=True)
+                self._schedule_thread.start()
+            return False
+        self._schedule = schedule
+        return True
+
+    def _build_schedule(self, session):
+        schedule = self.text_processor.get_schedule()
+        if session == self._session:
+            self._built_schedule = schedule
+
+    def _deadline(self, position):
+        """Absolute time at which the word at position is due"""
+        schedule = self._schedule
+        words = (schedule.offset(position) if schedule else position) - self._anchor_offset
+        return self._anchor + words * self.speed / 1000.0
+
+    def step(self, now):
+        """Show the next frame and return the perf_counter time of the one
+        after it, or None when the session is over. Run by the scheduler."""
+        if not self.is_running:
+            return None
         words = self.text_processor.get_words()
-        while self.current_position < len(words) and self.is_running:
-            self.display_callback(words[self.current_position])
-            time.sleep(self.speed / 1000.0)
-            self.current_position += 1
+        if self._pending_seek is not None:
+            self.current_position = self._pending_seek
+            self._pending_seek = None
+            self._rebase(now)
+        if self.current_position >= len(words):
+            complete = self.text_processor.is_complete()
+            words = self.text_processor.get_words()
+            if complete and self.current_position >= len(words):
+                self._finish(len(words))
+                return None
         if self.current_position >= len(words):
+            # The tokenizer is behind; look again shortly
+            self._waiting = True
+            return now + WORD_WAIT
+        if self._waiting:
+            # The tokenizer kept us waiting, start a fresh pace from here
+            self._waiting = False
+            self._load_schedule()
+            self._rebase(now)
+        elif self._schedule is None and self._load_schedule():
+            self._rebase(now)
+
+        if self.chunk_mode:
+            end = self.text_processor.chunk_end(self.current_position)
+            frame = " ".join(words[self.current_position:end])
+        else:
+            end = self.current_position + 1
+            frame = words[self.current_position]
+        shown_at = time.perf_counter()
+        if self.telemetry is not None and self.scheduler_mode == 'deadline':
+            self.telemetry.record(self._deadline(self.current_position), shown_at,
+                                  end - self.current_position)
+        if self._first_shown is None:
+            self._first_shown = shown_at
+        self._last_shown = shown_at
+        self._words_before_last = self.words_shown + self.words_skipped
+        self.display_callback(frame)
+        self.words_shown += end - self.current_position
+        self.current_position = end
+
+        if self.scheduler_mode == 'sleep':
+            return time.perf_counter() + self.speed / 1000.0
+
+        # The next word is due at its absolute deadline, so render time and
+        # timer overshoot never accumulate
+        now = time.perf_counter()
+        deadline = self._deadline(self.current_position)
+        if now < deadline:
+            return deadline
+        interval = self.speed / 1000.0
+        behind = int((now - deadline) / interval) if interval > 0 else 0
+        if behind < 1:
+            return deadline
+        if self.late_policy == 'skip':
+            # Drop the words whose slots have already passed
+            end = len(words)
+            skipped = 0
+            while self.current_position < end and self._deadline(self.current_position + 1) <= now:
+                self.current_position += 1
+                skipped += 1
+            self.words_skipped += skipped
+            if self.telemetry is not None:
+                self.telemetry.record_drops(skipped)
+        elif behind > self.max_catch_up_words:
+            # Too far behind (e.g. the UI stalled), don't flash a burst
+            self._rebase(now)
+        return self._deadline(self.current_position)
+
+    def _finish(self, word_count):
+        if self.current_position >= word_count:
             self.current_position = 0
             self.is_running = False
 
+    def remap_position(self, first, removed, added):
+        """Keep current_position on the same word after words first..first+removed
+        were replaced by added new ones"""
+        if self.current_position >= first + removed:
+            self.current_position += added - removed
+        elif self.current_position > first:
+            self.current_position = first
+
+    def get_pace_stats(self):
+        """Return target vs achieved WPM for the current or last session.
+
+        Achieved WPM counts the words whose display interval has ended, from
+        the first frame to the latest one, like PresentationTelemetry.stats.
+        """
+        target_wpm = 60000.0 / self.speed if self.speed else 0.0
+        stats = {
+            'target_wpm': target_wpm,
+            'achieved_wpm': 0.0,
+            'words_shown': self.words_shown,
+            'words_skipped': self.words_skipped,
+        }
+        if self._first_shown is not None:
+            elapsed = self._last_shown - self._first_shown
+            if elapsed > 0:
+                stats['achieved_wpm'] = self._words_before_last * 60.0 / elapsed
+        return stats
+
     def start_reading(self):
+        # Drops a pending step of an earlier session, and waits for one
+        # that is running, so two sessions never advance the position
+        self.scheduler.cancel(self)
+        self._session += 1
+        self._schedule = None
+        self._built_schedule = None
+        self._schedule_thread = None
+        self._pending_seek = None
+        self._waiting = False
         self.is_running = True
-        self.thread = threading.Thread(target=self.reading_thread)
-        self.thread.daemon = True
-        self.thread.start()
+        self._first_shown = None
+        self._last_shown = None
+        self._words_before_last = 0
+        self.words_shown = 0
+        self.words_skipped = 0
+        if self.telemetry is not None:
+            self.telemetry.reset()
+        self._load_schedule()
+        self._rebase(time.perf_counter())
+        self.scheduler.schedule(self)
 
     def stop_reading(self):
         self.is_running = False
-        if self.thread:
-            self.thread.join(timeout=0.5)
\ No newline at end of file
+        # No step of this session runs after this returns
+        self.scheduler.cancel(self)
@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+from array import array
+
+
+class PresentationTelemetry:
+    """Fixed-size ring buffer of scheduled vs actual display times.
+
+    The reading thread only writes three array slots per frame, so it can
+    stay on at any speed; statistics are computed from a snapshot when
+    asked for. Times are perf_counter seconds, lateness is reported in ms.
+    """
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._scheduled = array('d', bytes(8 * capacity))
+        self._actual = array('d', bytes(8 * capacity))
+        self._words = array('I', bytes(4 * capacity))
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.dropped = 0
+        self.started = time.time()
+
+    def record(self, scheduled, actual, words=1):
+        i = self.count % self.capacity
+        self._scheduled[i] = scheduled
+        self._actual[i] = actual
+        self._words[i] = words
+        self.count += 1
+
+    def record_drops(self, words):
+        self.dropped += words
+
+    def samples(self):
+        """Return the buffered (scheduled, actual, words) frames, oldest first"""
+        count = min(self.count, self.capacity)
+        start = self.count - count
+        order = [(start + k) % self.capacity for k in range(count)]
+        return [(self._scheduled[i], self._actual[i], self._words[i]) for i in order]
+
+    def stats(self, extra_drops=0):
+        """p50/p99 lateness, drops and the effective WPM over the buffered frames"""
+        samples = self.samples()
+        stats = {
+            'frames': self.count,
+            'dropped': self.dropped + extra_drops,
+            'jitter_p50_ms': 0.0,
+            'jitter_p99_ms': 0.0,
+            'jitter_max_ms': 0.0,
+            'effective_wpm': 0.0,
+        }
+        if not samples:
+            return stats
+        lateness = sorted(abs(actual - scheduled) * 1000 for scheduled, actual, _ in samples)
+        stats['jitter_p50_ms'] = lateness[len(lateness) // 2]
+        stats['jitter_p99_ms'] = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+        stats['jitter_max_ms'] = lateness[-1]
+        elapsed = samples[-1][1] - samples[0][1]
+        if elapsed > 0:
+            # Words of the first frame were shown before the measured span
+            words = sum(w for _, _, w in samples[1:])
+            stats['effective_wpm'] = words * 60.0 / elapsed
+        return stats
+
+    def export_csv(self, path):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['scheduled_s', 'actual_s', 'lateness_ms', 'words'])
+            for scheduled, actual, words in self.samples():
+                writer.writerow([f"{scheduled:.6f}", f"{actual:.6f}",
+                                 f"{(actual - scheduled) * 1000:.3f}", words])
+
+    def export_json(self, path, extra_drops=0):
+        data = {
+            'started': self.started,
+            'stats': self.stats(extra_drops),
+            'frames': [{'scheduled': s, 'actual': a, 'words': w} for s, a, w in self.samples()],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
@@ -0,0 +1,56 @@
+import tkinter as tk
+
+class EditTracker:
+    """Reports every insert/delete on a Text widget as a character-offset edit.
+
+    <<Modified>> only says that something changed, so the widget's Tcl
+    command is wrapped to see each edit with its exact position.
+    on_edit(offset, removed, inserted) is called after the edit is applied;
+    offset is None when the edit cannot be described (e.g. a multi-range
+    delete) and the whole text has to be resynced.
+    """
+    def __init__(self, widget, on_edit):
+        self.widget = widget
+        self.on_edit = on_edit
+        self._orig = widget._w + "_orig"
+        widget.tk.call("rename", widget._w, self._orig)
+        widget.tk.createcommand(widget._w, self._proxy)
+
+    def _call(self, *args):
+        return self.widget.tk.call((self._orig,) + args)
+
+    def _offset(self, index):
+        """Return the character offset of a Text index, clamped to the editable text"""
+        index = self._call('index', index)
+        if self.widget.tk.getboolean(self._call('compare', index, '>', 'end - 1c')):
+            index = self._call('index', 'end - 1c')
+        count = self._call('count', '-chars', '1.0', index)
+        return int(count) if count not in ('', None) else 0
+
+    def _describe(self, command, args):
+        if command == 'insert' and len(args) >= 2:
+            return self._offset(args[0]), 0, ''.join(args[1::2])
+        if command == 'delete' and len(args) in (1, 2):
+            start = self._offset(args[0])
+            if len(args) == 2:
+                end = self._offset(args[1])
+            else:
+                end = self._offset(f"{args[0]} + 1c")
+            return start, max(0, end - start), ''
+        if command == 'replace' and len(args) >= 3:
+            start = self._offset(args[0])
+            end = self._offset(args[1])
+            return start, max(0, end - start), ''.join(args[2::2])
+        return None, 0, ''
+
+    def _proxy(self, command, *args):
+        edit = None
+        if command in ('insert', 'delete', 'replace'):
+            try:
+                edit = self._describe(command, args)
+            except tk.TclError:
+                edit = (None, 0, '')
+        result = self._call(command, *args)
+        if edit is not None:
+            self.on_edit(*edit)
+        return result
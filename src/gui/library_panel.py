@@ -0,0 +1,80 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+class LibraryPanel:
+    """Searchable list of the books in the catalog.
+
+    Shows the cached catalog right away and refreshes once a background
+    rescan of the books directory has finished. on_open(path, position) is
+    called when a book is double-clicked or Enter is pressed.
+    """
+    def __init__(self, root, catalog, get_wpm, on_open):
+        self.root = root
+        self.catalog = catalog
+        self.get_wpm = get_wpm
+        self.on_open = on_open
+        self._books = {}
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Library")
+        self.window.geometry("720x480")
+
+        self.search_var = tk.StringVar()
+        search = ttk.Entry(self.window, textvariable=self.search_var, font=('Segoe UI', 12))
+        search.pack(fill='x', padx=10, pady=10)
+        search.bind('<KeyRelease>', lambda e: self.refresh())
+        search.bind('<Return>', lambda e: self.open_selected())
+        search.focus_set()
+
+        columns = ('words', 'time', 'progress')
+        self.tree = ttk.Treeview(self.window, columns=columns, selectmode='browse')
+        self.tree.heading('#0', text="Book")
+        self.tree.heading('words', text="Words")
+        self.tree.heading('time', text="Time left")
+        self.tree.heading('progress', text="Read")
+        self.tree.column('#0', width=360)
+        for column in columns:
+            self.tree.column(column, width=100, anchor='e')
+        self.tree.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        self.tree.bind('<Double-1>', lambda e: self.open_selected())
+        self.tree.bind('<Return>', lambda e: self.open_selected())
+
+        self.status = ttk.Label(self.window, text="Scanning books...")
+        self.status.pack(fill='x', padx=10, pady=(0, 10))
+
+        self.refresh()
+        self._scan = threading.Thread(target=self.catalog.scan, daemon=True)
+        self._scan.start()
+        self.window.after(100, self._wait_for_scan)
+
+    def _wait_for_scan(self):
+        # after() callbacks outlive the window, so stop once it was closed
+        if not self.window.winfo_exists():
+            return
+        if self._scan.is_alive():
+            self.window.after(100, self._wait_for_scan)
+            return
+        self.refresh()
+
+    def refresh(self):
+        books = self.catalog.query(self.search_var.get().strip(), self.get_wpm())
+        self.tree.delete(*self.tree.get_children())
+        self._books = {}
+        for book in books:
+            minutes = book['minutes_left']
+            item = self.tree.insert('', 'end', text=book['name'], values=(
+                f"{book['word_count']:,}",
+                f"{int(minutes // 60)}h {minutes % 60:02.0f}m",
+                f"{book['progress']:.0%}"))
+            self._books[item] = book
+        scanning = self._scan.is_alive() if hasattr(self, '_scan') else True
+        self.status.config(text=f"{len(books)} books" + (" - scanning..." if scanning else ""))
+
+    def open_selected(self):
+        selection = self.tree.selection() or self.tree.get_children()[:1]
+        if not selection:
+            return
+        book = self._books[selection[0]]
+        self.window.destroy()
+        self.on_open(book['path'], book['position'])
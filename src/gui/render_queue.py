@@ -0,0 +1,69 @@
+import threading
+from collections import deque
+
+class RenderQueue:
+    """Bounded, coalescing frame queue between the reading thread and Tk.
+
+    The reading thread pushes frames without ever waiting on the UI; the Tk
+    main loop drains it and only renders the newest frame, dropping stale ones.
+    """
+    def __init__(self, maxlen=2):
+        self._frames = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.pushed = 0
+        self.rendered = 0
+        self.dropped = 0
+
+    def push(self, frame):
+        """Queue a frame, evicting the oldest one when the UI falls behind"""
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append(frame)
+            self.pushed += 1
+
+    def drain(self):
+        """Return the newest pending frame (or None) and discard the rest"""
+        with self._lock:
+            if not self._frames:
+                return None
+            frame = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+        self.rendered += 1
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+
+class RenderPump:
+    """Drains a RenderQueue from the Tk main loop via after()"""
+    def __init__(self, root, queue, render, interval_ms=4):
+        self.root = root
+        self.queue = queue
+        self.render = render
+        self.interval_ms = interval_ms
+        self._after_id = None
+        self._keep_running = None
+
+    def start(self, keep_running=None):
+        """Start polling; stops by itself once keep_running() is false and the queue is empty"""
+        self._keep_running = keep_running
+        if self._after_id is None:
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        frame = self.queue.drain()
+        if frame is not None:
+            self.render(frame)
+        if frame is None and self._keep_running is not None and not self._keep_running():
+            self._after_id = None
+            return
+        self._after_id = self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,26 @@
+import tkinter.font as tkfont
+
+class TextMeasurer:
+    """Pixel width of text in a font, from a table of per-character widths.
+
+    The table is filled on the Tk thread when the measurer is created, so
+    width() can be called from the reading thread without touching Tk.
+    Characters outside it count as wide as 'W' to never overflow.
+    """
+    def __init__(self, font, chars=None):
+        if chars is None:
+            chars = [chr(c) for c in range(32, 127)] + [chr(c) for c in range(160, 384)]
+        self._widths = {ch: font.measure(ch) for ch in chars}
+        self._fallback = font.measure('W')
+
+    @classmethod
+    def for_style(cls, root, style, widget_style):
+        """Build a measurer for the font of a ttk style such as 'Reader.TLabel'"""
+        return cls(tkfont.Font(root=root, font=style.lookup(widget_style, 'font')))
+
+    def width(self, text):
+        widths = self._widths
+        fallback = self._fallback
+        return sum(widths.get(ch, fallback) for ch in text)
+
+    __call__ = width
@@ -0,0 +1,89 @@
+import tkinter as tk
+
+class VirtualTextView:
+    """Shows a window of a memory-mapped book in a ScrolledText widget.
+
+    Only WINDOW_BYTES around the reading position are decoded and inserted,
+    so opening a book takes the same time whatever its size. Scrolling to
+    either edge of the window slides it through the file. The widget is
+    read-only meanwhile: an edit could only change the window, not the book.
+    close() (see SpeedReaderApp.new_text) makes it editable again.
+    """
+    WINDOW_BYTES = 64 * 1024
+
+    def __init__(self, text_widget):
+        self.text = text_widget
+        self.buffer = None
+        self.window_start = 0
+        self.window_end = 0
+        self._shift_pending = False
+        self._scrollbar_set = text_widget.vbar.set
+        text_widget.configure(yscrollcommand=self._on_scroll)
+
+    @property
+    def active(self):
+        return self.buffer is not None
+
+    def open(self, buffer, offset=0):
+        """Display buffer (UTF-8 bytes or mmap) around byte offset"""
+        self.buffer = buffer
+        self.show(offset)
+
+    def close(self):
+        """Stop windowing; the widget keeps its current contents and is editable again"""
+        self.buffer = None
+        self.text.configure(state='normal')
+
+    def show(self, offset):
+        """Load the window centred on byte offset"""
+        start = max(0, offset - self.WINDOW_BYTES // 2)
+        self._load(start, start + self.WINDOW_BYTES)
+
+    def index_of(self, offset):
+        """Return the Text index of a byte offset, moving the window if needed"""
+        if not self.window_start <= offset < self.window_end:
+            self.show(offset)
+        chars = len(self.buffer[self.window_start:offset].decode('utf-8', 'replace'))
+        return f"1.0 + {chars} chars"
+
+    def _align(self, pos):
+        """Move pos forward to the start of a UTF-8 character"""
+        length = len(self.buffer)
+        pos = min(max(pos, 0), length)
+        while pos < length and 0x80 <= self.buffer[pos] < 0xC0:
+            pos += 1
+        return pos
+
+    def _load(self, start, end):
+        start, end = self._align(start), self._align(end)
+        content = self.buffer[start:end].decode('utf-8', 'replace')
+        self.text.configure(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', content)
+        self.text.edit_modified(False)
+        self.text.configure(state='disabled')
+        self.window_start, self.window_end = start, end
+
+    def _on_scroll(self, first, last):
+        self._scrollbar_set(first, last)
+        if self.buffer is None or self._shift_pending:
+            return
+        if float(first) <= 0.0 and self.window_start > 0:
+            direction = -1
+        elif float(last) >= 1.0 and self.window_end < len(self.buffer):
+            direction = 1
+        else:
+            return
+        self._shift_pending = True
+        self.text.after_idle(self._shift, direction)
+
+    def _shift(self, direction):
+        """Slide the window by half its size, keeping the same text in view"""
+        self._shift_pending = False
+        if self.buffer is None:
+            return
+        top = self.text.get('1.0', self.text.index('@0,0'))
+        top_offset = self.window_start + len(top.encode('utf-8'))
+        start = self.window_start + direction * self.WINDOW_BYTES // 2
+        self._load(max(0, start), max(0, start) + self.WINDOW_BYTES)
+        self.text.yview(self.index_of(top_offset))
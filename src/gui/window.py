@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 from controllers.speed_controller import SpeedController
 from utils.text_processor import TextProcessor
+from gui.render_queue import RenderQueue, RenderPump
 
 class SpeedReaderWindow:
     def __init__(self, root):
@@ -36,19 +37,23 @@ class SpeedReaderWindow:
         
         # Initialize components
         self.text_processor = TextProcessor()
-        self.speed_controller = SpeedController(self.text_processor, self.update_display)
+        self.render_queue = RenderQueue()
+        self.render_pump = RenderPump(self.root, self.render_queue, self.update_display)
+        self.speed_controller = SpeedController(self.text_processor, self.render_queue.push)
         
     def update_display(self, word):
         self.display_label.config(text=word)
-        self.root.update()
         
     def start_reading(self):
         text = self.text_input.get("1.0", tk.END)
-        self.text_processor.set_text(text)
+        if text != self.text_processor.text:
+            self.text_processor.stream_text(text)
         speed_wpm = int(self.speed_var.get())
         speed_ms = int(60000 / speed_wpm)  # Convert WPM to milliseconds
         self.speed_controller.set_speed(speed_ms)
+        self.render_queue.clear()
         self.speed_controller.start_reading()
+        self.render_pump.start(lambda: self.speed_controller.is_running)
         
     def stop_reading(self):
         self.speed_controller.stop_reading()
\ No newline at end of file
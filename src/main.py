@@ -1,11 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-from tkinter import filedialog
 from controllers.speed_controller import SpeedController
 from utils.text_processor import TextProcessor
-from utils.scrape import scrape_headway_book  # We'll create this function
+from gui.render_queue import RenderQueue, RenderPump
+from gui.text_view import VirtualTextView
+from gui.edit_tracker import EditTracker
+from gui.text_metrics import TextMeasurer
+from utils.book_cache import BookCache
+from utils.progress_store import ProgressStore, content_hash
+from utils.catalog import LibraryCatalog
+from utils.search_index import BookSearch
+from utils.lexicon import Lexicon
 import threading
-import json
+import multiprocessing
+import queue
+from bisect import bisect_left
 from pathlib import Path
 import time
 
@@ -55,6 +64,12 @@ class SpeedReaderApp:
             relief='solid'
         )
         self.text_input.pack(pady=20)
+        # Books loaded from files are shown through a window of the mmapped file
+        self.text_view = VirtualTextView(self.text_input)
+        # Edits of pasted text are re-tokenized incrementally on the next start
+        self.pending_edits = []
+        self.text_dirty = False
+        EditTracker(self.text_input, self.on_text_edit)
         self.text_container.pack()
         
         # Display area
@@ -78,6 +93,31 @@ class SpeedReaderApp:
                               font=('Helvetica', 12))
         speed_entry.pack(side='left', padx=5)
         
+        # Chunk mode shows short phrases instead of single words
+        self.chunk_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.speed_frame, text="Chunks", variable=self.chunk_var).pack(side='left', padx=5)
+        self.chunk_measurer = None
+        self.chunk_width = None
+
+        # Full-text search; Enter jumps to the next hit, Shift+Enter to the previous
+        ttk.Label(self.speed_frame, text="Find:", font=('Helvetica', 12)).pack(side='left', padx=5)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self.speed_frame, textvariable=self.search_var, width=16,
+                                      font=('Helvetica', 12))
+        self.search_entry.pack(side='left', padx=5)
+        self.search_entry.bind('<Return>', lambda e: self.find_next())
+        self.search_entry.bind('<Shift-Return>', lambda e: self.find_next(backwards=True))
+        self.search_entry.bind('<Escape>', lambda e: self.root.focus_set())
+        self.search_hits = (None, None)
+        
+        # Optional timing overlay in the top left corner
+        self.telemetry_label = ttk.Label(root, text="", font=('Consolas', 10))
+        self.telemetry_visible = False
+        # Pending after() id of the overlay refresh
+        self.telemetry_after = None
+        self.render_drops_at_start = 0
+        self.telemetry_dir = Path("telemetry")
+        
         # Center - Control buttons
         self.button_frame = ttk.Frame(self.bottom_panel)  # Make it instance variable
         self.button_frame.pack(side='left', padx=20)
@@ -97,6 +137,12 @@ class SpeedReaderApp:
         ttk.Button(self.button_frame, text="Load Book", 
                   style='Controls.TButton',
                   command=self.load_book_from_file).pack(side='left', padx=10)
+        ttk.Button(self.button_frame, text="Library", 
+                  style='Controls.TButton',
+                  command=self.show_library).pack(side='left', padx=10)
+        ttk.Button(self.button_frame, text="New Text", 
+                  style='Controls.TButton',
+                  command=self.new_text).pack(side='left', padx=10)
         
         ttk.Button(self.button_frame, text="Toggle Theme", 
                   style='Controls.TButton',
@@ -114,15 +160,34 @@ class SpeedReaderApp:
         
         # Initialize components
         self.text_processor = TextProcessor()
-        self.speed_controller = SpeedController(self.text_processor, self.update_display)
+        # The reading thread only pushes frames; Tk drains them on its own loop
+        self.render_queue = RenderQueue()
+        self.render_pump = RenderPump(self.root, self.render_queue, self.update_display)
+        self.speed_controller = SpeedController(self.text_processor, self.render_queue.push)
         self.dark_mode = False
         self.theme_mode = 0  # 0: light, 1: dark, 2: custom
         self.paused = False
         
         # Add these new instance variables
         self.current_file_path = None
+        self.current_book_hash = None
+        self.document_pages = None
         self.saves_dir = Path("saves")
         self.saves_dir.mkdir(exist_ok=True)
+        # Positions of all books; written in the background every few seconds
+        self.progress = ProgressStore(self.saves_dir / "progress.db")
+        self.checkpoint_interval_ms = 5000
+        # Pending after() id of the checkpoint chain; one chain at most
+        self.checkpoint_after = None
+        # Word counts of everything in books/, joined with the progress
+        self.catalog = LibraryCatalog(Path("books"), self.saves_dir / "progress.db")
+        # Pre-tokenized book indexes live next to the saves
+        self.text_processor.cache = BookCache(self.saves_dir.parent / "cache")
+        # Word frequencies for pacing; only read once a schedule is built
+        # (see speedreader.py lexicon to create it)
+        self.text_processor.lexicon = Lexicon(Path("data") / "lexicon.bin")
+        # Inverted index of the loaded text, built in the background
+        self.search = BookSearch(self.text_processor, self.saves_dir / "search")
         
         # Add window close handler
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -131,10 +196,25 @@ class SpeedReaderApp:
         self.apply_theme()
         
         # Add key bindings
-        self.root.bind('<s>', lambda e: self.toggle_reading())  # Space to toggle reading
-        self.root.bind('<h>', lambda e: self.toggle_controls())     # 'h' key to hide/show controls
-        self.root.bind('<t>', lambda e: self.toggle_theme())         # 't' key to toggle text
-        self.root.bind('<a>', lambda e: self.toggle_text())  # 'c' key to toggle controls
+        # Letter keys are ignored while typing in a text field (see shortcut)
+        self.root.bind('<s>', lambda e: self.shortcut(e, self.toggle_reading))  # Space to toggle reading
+        self.root.bind('<h>', lambda e: self.shortcut(e, self.toggle_controls))     # 'h' key to hide/show controls
+        self.root.bind('<t>', lambda e: self.shortcut(e, self.toggle_theme))         # 't' key to toggle text
+        self.root.bind('<a>', lambda e: self.shortcut(e, self.toggle_text))  # 'c' key to toggle controls
+        self.root.bind('<c>', lambda e: self.shortcut(e, lambda: self.chunk_var.set(not self.chunk_var.get())))  # 'c' key to toggle chunks
+        self.root.bind('<o>', lambda e: self.shortcut(e, self.toggle_telemetry))  # 'o' key to toggle the timing overlay
+        self.root.bind('<e>', lambda e: self.shortcut(e, self.export_telemetry))  # 'e' key to export session timing
+        self.root.bind('<l>', lambda e: self.shortcut(e, self.show_library))  # 'l' key to open the library
+        self.root.bind('<n>', lambda e: self.shortcut(e, self.new_text))  # 'n' key to close the book for pasted text
+        self.root.bind('<f>', lambda e: self.navigate(e, self.search_entry.focus_set))  # 'f' key to search
+        # Arrows move by sentence, Up/Down by paragraph, 0-9 jump to 0%-90% of the book
+        controller = self.speed_controller
+        self.root.bind('<Left>', lambda e: self.navigate(e, controller.previous_sentence))
+        self.root.bind('<Right>', lambda e: self.navigate(e, controller.next_sentence))
+        self.root.bind('<Up>', lambda e: self.navigate(e, controller.previous_paragraph))
+        self.root.bind('<Down>', lambda e: self.navigate(e, controller.next_paragraph))
+        for digit in range(10):
+            self.root.bind(str(digit), lambda e, d=digit: self.navigate(e, lambda: controller.jump_to_percent(d * 10)))
     def apply_theme(self):
         if self.theme_mode == 0:  # Light theme
             bg_color = '#ffffff'
@@ -215,6 +295,7 @@ class SpeedReaderApp:
         )
 
         # Configure text input
+        self.text_input.tag_configure('current_word', background=accent_color)
         self.text_input.configure(
             bg=secondary_bg,
             fg=fg_color_input,
@@ -225,26 +306,210 @@ class SpeedReaderApp:
 
     def update_display(self, word):
         self.display_label.config(text=word)
-        self.root.update()
         
     def toggle_reading(self):
         if self.start_stop_button['text'] == 'Start':
-            # Start reading
-            text = self.text_input.get("1.0", tk.END)
-            self.text_processor.set_text(text)
+            # Start reading; the window of an open book is read-only
+            if not self.text_view.active:
+                self.sync_text()
             
             try:
                 speed_wpm = int(self.speed_var.get())
                 speed_ms = int(60000 / speed_wpm)
                 self.speed_controller.set_speed(speed_ms)
+                self.speed_controller.chunk_mode = self.chunk_var.get()
+                if self.speed_controller.chunk_mode:
+                    self.update_chunking()
+                self.render_queue.clear()
+                self.render_drops_at_start = self.render_queue.dropped
                 self.speed_controller.start_reading()
+                self.render_pump.start(lambda: self.speed_controller.is_running)
+                # A session that ended by itself may have left its chain pending
+                self.cancel_checkpoints()
+                self.checkpoint_after = self.root.after(self.checkpoint_interval_ms, self.checkpoint_progress)
                 self.start_stop_button.configure(text='Stop', style='Stop.TButton')
             except ValueError:
                 self.display_label.config(text="Please enter a valid speed")
         else:
             # Stop reading
             self.speed_controller.stop_reading()
+            self.cancel_checkpoints()
             self.start_stop_button.configure(text='Start', style='Start.TButton')
+            self.save_progress()
+            self.show_pace_stats()
+            self.show_position_in_text()
+
+    def save_progress(self):
+        """Queue the reading position of the current book for the progress store"""
+        if self.current_file_path:
+            self.progress.checkpoint(self.current_file_path, self.speed_controller.current_position,
+                                     self.current_book_hash)
+
+    def checkpoint_progress(self):
+        """Save the position periodically while reading so a crash loses little"""
+        self.checkpoint_after = None
+        if self.speed_controller.is_running:
+            self.save_progress()
+            self.checkpoint_after = self.root.after(self.checkpoint_interval_ms, self.checkpoint_progress)
+
+    def cancel_checkpoints(self):
+        if self.checkpoint_after is not None:
+            self.root.after_cancel(self.checkpoint_after)
+            self.checkpoint_after = None
+
+    def telemetry_stats(self):
+        """Timing stats of the current session, including frames the UI dropped"""
+        render_drops = self.render_queue.dropped - self.render_drops_at_start
+        return self.speed_controller.telemetry.stats(render_drops)
+
+    def toggle_telemetry(self):
+        self.telemetry_visible = not self.telemetry_visible
+        if self.telemetry_visible:
+            self.telemetry_label.place(x=10, y=10)
+            self.update_telemetry()
+        else:
+            self.telemetry_label.place_forget()
+            # Stop the refresh chain so showing it again starts only one
+            if self.telemetry_after is not None:
+                self.root.after_cancel(self.telemetry_after)
+                self.telemetry_after = None
+
+    def update_telemetry(self):
+        self.telemetry_after = None
+        if not self.telemetry_visible:
+            return
+        stats = self.telemetry_stats()
+        self.telemetry_label.config(
+            text=f"jitter p50 {stats['jitter_p50_ms']:.1f} ms  p99 {stats['jitter_p99_ms']:.1f} ms  "
+                 f"drops {stats['dropped']}  {stats['effective_wpm']:.0f} WPM")
+        self.telemetry_after = self.root.after(500, self.update_telemetry)
+
+    def export_telemetry(self):
+        """Write the timing of the last session to telemetry/ as CSV and JSON"""
+        telemetry = self.speed_controller.telemetry
+        if not telemetry.count:
+            return
+        self.telemetry_dir.mkdir(exist_ok=True)
+        name = time.strftime('session-%Y%m%d-%H%M%S', time.localtime(telemetry.started))
+        telemetry.export_csv(self.telemetry_dir / f"{name}.csv")
+        render_drops = self.render_queue.dropped - self.render_drops_at_start
+        telemetry.export_json(self.telemetry_dir / f"{name}.json", render_drops)
+        self.display_label.config(text=f"Timing saved as {name}")
+
+    def update_chunking(self):
+        """Cap chunks at the width the reader label can show in this window"""
+        if self.chunk_measurer is None:
+            self.chunk_measurer = TextMeasurer.for_style(self.root, self.style, 'Reader.TLabel')
+        window_width = self.root.winfo_width()
+        if window_width <= 1:
+            window_width = self.root.winfo_screenwidth()
+        max_width = int(window_width * 0.8)
+        if max_width != self.chunk_width:
+            self.chunk_width = max_width
+            self.text_processor.set_chunking(self.chunk_measurer, max_width)
+
+    def shortcut(self, event, action):
+        """Run the action of a key binding unless a text field has the key"""
+        if isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Text)):
+            return
+        action()
+
+    def navigate(self, event, move):
+        """Run a seek of the speed controller unless a text field has the key"""
+        if isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Text)):
+            return
+        if not self.text_processor.word_count():
+            return
+        position = move()
+        if position is not None:
+            self.show_seek(position)
+
+    def show_seek(self, position, note=""):
+        if not self.speed_controller.is_running:
+            word_count = self.text_processor.word_count()
+            self.display_label.config(text=f"{self.text_processor.word(position)}  "
+                                           f"({position / word_count:.0%}){note}")
+            self.show_position_in_text()
+        self.save_progress()
+
+    def find_next(self, backwards=False):
+        """Jump to the next hit of the search box after the reading position"""
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        if not self.speed_controller.is_running and not self.text_view.active \
+                and (self.pending_edits or self.text_dirty):
+            self.sync_text()
+        last_query, hits = self.search_hits
+        if query != last_query or hits is None or not self.search.is_current():
+            hits = self.search.find(query)
+            if hits is None:
+                # Still indexing, try again shortly
+                self.display_label.config(text="Indexing book...")
+                self.root.after(200, lambda: self.find_next(backwards))
+                return
+            self.search_hits = (query, hits)
+        if not hits:
+            self.display_label.config(text=f"No match for {query}")
+            return
+        controller = self.speed_controller
+        hit = self.search.next_hit(hits, controller.shown_position(), backwards)
+        position = controller.seek(hit)
+        number = bisect_left(hits, hit) + 1
+        self.show_seek(position, f"  match {number} of {len(hits)}")
+
+    def show_position_in_text(self):
+        """Scroll the text input to the word the reader stopped at"""
+        position = self.speed_controller.current_position
+        if position >= self.text_processor.word_count():
+            return
+        offset = self.text_processor.char_offset(position)
+        if self.text_view.active:
+            index = self.text_view.index_of(offset)
+        else:
+            index = f"1.0 + {offset} chars"
+        word = self.text_processor.get_words()[position]
+        self.text_input.tag_remove('current_word', '1.0', tk.END)
+        self.text_input.tag_add('current_word', index, f"{index} + {len(word)} chars")
+        self.text_input.see(index)
+
+    def on_text_edit(self, offset, removed, inserted):
+        """Queue an edit of the pasted text, merging runs of typing"""
+        if self.text_view.active or self.text_dirty:
+            return
+        if offset is None:
+            self.text_dirty = True
+            return
+        if self.pending_edits:
+            last_offset, last_removed, last_inserted = self.pending_edits[-1]
+            if not removed and offset == last_offset + len(last_inserted):
+                self.pending_edits[-1] = (last_offset, last_removed, last_inserted + inserted)
+                return
+            if not inserted and offset + removed == last_offset + len(last_inserted) and removed <= len(last_inserted):
+                self.pending_edits[-1] = (last_offset, last_removed, last_inserted[:len(last_inserted) - removed])
+                return
+        self.pending_edits.append((offset, removed, inserted))
+
+    def sync_text(self):
+        """Bring the tokenized text up to date with the text input"""
+        edits, self.pending_edits = self.pending_edits, []
+        for edit in edits:
+            if self.text_dirty:
+                break
+            change = self.text_processor.apply_edit(*edit)
+            if change is None:
+                self.text_dirty = True
+            else:
+                self.speed_controller.remap_position(*change)
+        if self.text_dirty:
+            self.text_processor.stream_text(self.text_input.get("1.0", tk.END))
+            self.text_dirty = False
+
+    def show_pace_stats(self):
+        """Show the achieved reading pace of the last session in the title bar"""
+        stats = self.speed_controller.get_pace_stats()
+        if stats['achieved_wpm']:
+            self.root.title(f"Speed Reader - {stats['achieved_wpm']:.0f} / {stats['target_wpm']:.0f} WPM")
         
     def toggle_text(self):
         if hasattr(self.text_container, '_is_hidden') and not self.text_container._is_hidden:
@@ -292,6 +557,9 @@ class SpeedReaderApp:
             self.headway_frame._is_hidden = False
 
     def scrape_and_load_book(self):
+        # Loaded on first use; the scraper is the heaviest part of the app
+        from utils.scrape import scrape_headway_book
+
         # Disable inputs while scraping
         for child in self.headway_frame.winfo_children():
             if isinstance(child, ttk.Entry) or isinstance(child, ttk.Button):
@@ -300,50 +568,71 @@ class SpeedReaderApp:
         # Show loading message
         self.display_label.config(text="Scraping book...")
         
-        # Start scraping in a separate thread
+        # Pages are fed to the reader as they arrive, so reading can start
+        # before the whole book is scraped
+        book_name = self.book_url_var.get().split('/')[-2]  # Get book name from URL
+        file_path = Path("books") / f"{book_name}.txt"
+        pages = queue.Queue()
+        if self.speed_controller.is_running:
+            self.toggle_reading()
+        self.document_pages = None
+        self.text_view.close()
+        self.pending_edits = []
+        self.text_dirty = False
+        self.save_progress()
+        self.text_processor.stream_pages(pages)
+        self.speed_controller.current_position = 0
+        self.current_file_path = str(file_path)
+        self.current_book_hash = None
+
+        first_page = [True]
+        email, password, book_url = self.email_var.get(), self.password_var.get(), self.book_url_var.get()
+
+        def on_page(text):
+            pages.put(text)
+            if first_page[0]:
+                first_page[0] = False
+                self.root.after(0, self.first_page_ready)
+
+        # Start scraping in a separate thread; everything that touches Tk is
+        # handed back to the main loop with root.after
         def scrape_thread():
+            error = None
             try:
-                # Get the scraped text
-                scraped_text = scrape_headway_book(
-                    self.email_var.get(),
-                    self.password_var.get(),
-                    self.book_url_var.get()
-                )
-                
-                # Create a filename from the URL
-                book_name = self.book_url_var.get().split('/')[-2]  # Get book name from URL
-                file_path = Path("books") / f"{book_name}.txt"
-                
-                # Create books directory if it doesn't exist
-                file_path.parent.mkdir(exist_ok=True)
-                
-                # Save scraped text to file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(scraped_text)
-                
-                # Load the saved file using existing load_book_from_file functionality
-                self.current_file_path = str(file_path)
-                self.text_input.delete('1.0', tk.END)
-                self.text_input.insert('1.0', scraped_text)
-                
-                # Hide the headway frame
-                self.headway_frame.pack_forget()
-                self.headway_frame._is_hidden = True
-                
-                # Show success message
-                self.display_label.config(text=f"Book saved as {file_path.name} and loaded!")
-                
+                # Scrape straight into the file (pages are checkpointed on the way)
+                scrape_headway_book(email, password, book_url, output_path=file_path, on_page=on_page)
             except Exception as e:
-                self.display_label.config(text=f"Error: {str(e)}")
-                
+                error = e
             finally:
-                # Re-enable inputs
-                for child in self.headway_frame.winfo_children():
-                    if isinstance(child, ttk.Entry) or isinstance(child, ttk.Button):
-                        child['state'] = 'normal'
+                pages.put(None)
+            self.root.after(0, lambda: self.scrape_finished(file_path, error))
         
         threading.Thread(target=scrape_thread, daemon=True).start()
 
+    def first_page_ready(self):
+        if not self.speed_controller.is_running:
+            self.display_label.config(text="First page ready - press Start to begin reading")
+
+    def scrape_finished(self, file_path, error):
+        """Runs on the Tk thread once the scrape thread is done"""
+        # Re-enable inputs
+        for child in self.headway_frame.winfo_children():
+            if isinstance(child, ttk.Entry) or isinstance(child, ttk.Button):
+                child['state'] = 'normal'
+        if error is not None:
+            self.display_label.config(text=f"Error: {str(error)}")
+            return
+
+        # Hide the headway frame
+        self.headway_frame.pack_forget()
+        self.headway_frame._is_hidden = True
+
+        # Switch to the saved file unless the reader is already going or
+        # another book was opened meanwhile
+        if not self.speed_controller.is_running and self.current_file_path == str(file_path):
+            self.open_book(file_path, self.speed_controller.current_position)
+            self.display_label.config(text=f"Book saved as {file_path.name} and loaded!")
+
     def toggle_controls(self):
         if hasattr(self.speed_frame, '_is_hidden') and not self.speed_frame._is_hidden:
             # Hide controls
@@ -362,67 +651,144 @@ class SpeedReaderApp:
 
     def load_book_from_file(self):
         """Open file dialog and load text file content into the reader"""
+        from tkinter import filedialog, messagebox
+
         file_path = filedialog.askopenfilename(
             title="Select a book file",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("Books", "*.txt *.epub *.html *.htm *.xhtml *.md *.markdown"),
+                       ("Text files", "*.txt"), ("All files", "*.*")]
         )
         
         if file_path:
             try:
-                self.current_file_path = file_path
-                save_file = self.saves_dir / f"{Path(file_path).stem}_save.json"
+                position = 0
+                # Found by path, or by content if the book was moved
+                book_hash = content_hash(file_path)
+                saved_position = self.progress.lookup(file_path, book_hash)
                 
-                # Check if we have a save file
-                if save_file.exists():
-                    with open(save_file, 'r', encoding='utf-8') as f:
-                        save_data = json.load(f)
-                        position = save_data.get('position', 0)
-                        
-                        # Load the full file
-                        with open(file_path, 'r', encoding='utf-8') as book_file:
-                            content = book_file.read()
-                        
-                        # Ask user if they want to continue from saved position
-                        if position > 0:
-                            if tk.messagebox.askyesno("Resume Reading", 
-                                "Would you like to continue from where you left off?"):
-                                # Set the content and position
-                                self.text_input.delete('1.0', tk.END)
-                                self.text_input.insert('1.0', content)
-                                self.speed_controller.current_position = position
-                                self.display_label.config(text="Book loaded from saved position!")
-                                return
+                # Ask user if they want to continue from saved position
+                if saved_position > 0:
+                    if messagebox.askyesno("Resume Reading", 
+                        "Would you like to continue from where you left off?"):
+                        position = saved_position
                 
-                # If no save file or user chose not to continue
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    self.text_input.delete('1.0', tk.END)
-                    self.text_input.insert('1.0', content)
-                    self.speed_controller.current_position = 0
+                self.open_book(file_path, position, book_hash)
+                if position > 0:
+                    self.display_label.config(text="Book loaded from saved position!")
+                else:
                     self.display_label.config(text="Book loaded successfully!")
                     
             except Exception as e:
                 self.display_label.config(text=f"Error loading file: {str(e)}")
 
+    def show_library(self):
+        from gui.library_panel import LibraryPanel
+
+        # Positions still waiting for the background writer should show up
+        self.save_progress()
+        self.progress.flush()
+        LibraryPanel(self.root, self.catalog, self.current_wpm, self.open_library_book)
+
+    def current_wpm(self):
+        try:
+            return max(1, int(self.speed_var.get()))
+        except ValueError:
+            return 300
+
+    def open_library_book(self, file_path, position):
+        if self.speed_controller.is_running:
+            self.toggle_reading()
+        try:
+            self.open_book(file_path, position)
+            self.display_label.config(text=f"{Path(file_path).stem} loaded!")
+        except Exception as e:
+            self.display_label.config(text=f"Error loading file: {str(e)}")
+
+    def open_book(self, file_path, position=0, book_hash=None):
+        """Memory-map a book file and show only the part around the reading position.
+
+        EPUB, HTML and Markdown books are parsed into the reader chapter by chapter.
+        """
+        from utils.ingest import DOCUMENT_SUFFIXES
+
+        self.save_progress()
+        self.current_file_path = str(file_path)
+        self.current_book_hash = book_hash or content_hash(file_path)
+        # Cancels the parse of a document opened before; open_document sets its own
+        self.document_pages = None
+        if Path(file_path).suffix.lower() in DOCUMENT_SUFFIXES:
+            self.open_document(file_path)
+        else:
+            # Tokenizes in the background, so this returns right away
+            self.text_processor.stream_text(Path(file_path))
+            self.text_view.open(self.text_processor.buffer)
+        self.speed_controller.current_position = position
+        if position and self.text_view.active:
+            self.root.after(0, self.reveal_position, str(file_path))
+        self.search.prepare()
+
+    def reveal_position(self, file_path):
+        """Move the book window to a restored position once that word is tokenized"""
+        if self.current_file_path != file_path or self.speed_controller.is_running:
+            return
+        if self.text_processor.word_count() > self.speed_controller.current_position:
+            self.show_position_in_text()
+        elif not self.text_processor.is_complete():
+            self.root.after(50, self.reveal_position, file_path)
+
+    def new_text(self):
+        """Close the open book and go back to reading text typed or pasted into the box"""
+        if self.speed_controller.is_running:
+            self.toggle_reading()
+        self.save_progress()
+        self.document_pages = None
+        self.current_file_path = None
+        self.current_book_hash = None
+        self.text_view.close()
+        # Start re-reads the whole box, so clearing it is not tracked as an edit
+        self.pending_edits = []
+        self.text_dirty = True
+        self.text_input.delete('1.0', tk.END)
+        self.text_input.edit_modified(False)
+        self.speed_controller.current_position = 0
+        self.text_input.focus_set()
+        self.display_label.config(text="Type or paste text, then press Start")
+
+    def open_document(self, file_path):
+        """Stream the text of a document into the reader while it is parsed"""
+        from utils.ingest import ingest
+
+        pages = queue.Queue()
+        self.document_pages = pages
+        self.text_view.close()
+        # The text box would show the previous book, whose offsets no longer match
+        self.text_input.delete('1.0', tk.END)
+        self.text_input.edit_modified(False)
+        self.pending_edits = []
+        self.text_dirty = False
+        self.text_processor.stream_pages(pages)
+        # Stops parsing once another book or text replaces this one; every
+        # load path resets document_pages
+        cancelled = lambda: self.document_pages is not pages
+
+        def on_error(e):
+            self.root.after(0, lambda: self.document_failed(pages, e))
+
+        threading.Thread(target=ingest, args=(file_path, pages),
+                         kwargs={'cancelled': cancelled, 'on_error': on_error},
+                         daemon=True).start()
+
+    def document_failed(self, pages, error):
+        """Show why a document stopped parsing, unless another book replaced it"""
+        if self.document_pages is pages:
+            self.display_label.config(text=f"Error loading file: {str(error)}")
+
     def on_closing(self):
         """Handle window closing event"""
         try:
-            if self.current_file_path:
-                # Get current position and content
-                position = self.speed_controller.current_position
-                content = self.text_input.get('1.0', tk.END)
-                
-                # Create save data
-                save_data = {
-                    'position': position,
-                    'timestamp': str(time.time()),
-                    'file_path': self.current_file_path
-                }
-                
-                # Save to JSON file
-                save_file = self.saves_dir / f"{Path(self.current_file_path).stem}_save.json"
-                with open(save_file, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, indent=4)
+            self.speed_controller.stop_reading()
+            self.save_progress()
+            self.progress.close()
                     
         except Exception as e:
             print(f"Error saving progress: {str(e)}")
@@ -431,6 +797,8 @@ class SpeedReaderApp:
             self.root.destroy()
 
 def main():
+    # Document parsing uses a process pool, which frozen builds need this for
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = SpeedReaderApp(root)
     root.mainloop()
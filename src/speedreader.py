@@ -0,0 +1,166 @@
+"""Headless speed reader: tokenize, estimate, scrape and export without a window.
+
+Usage (from the repository root):
+    python src/speedreader.py tokenize books/book.txt
+    python src/speedreader.py estimate books/book.txt --wpm 400
+    python src/speedreader.py scrape https://app.makeheadway.com/books/<name>/summary --email me@example.com
+    python src/speedreader.py export books/book.txt --wpm 300 --format csv -o book.csv
+    python src/speedreader.py lexicon --list frequencies.txt books/
+
+The functions here can also be imported as a library. Nothing in this module
+imports tkinter, and the scraper is only loaded by the scrape command.
+"""
+import argparse
+import csv
+import getpass
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+from utils.book_cache import BookCache
+from utils.text_processor import TextProcessor
+
+
+def load_book(path, cache_dir=Path("cache")):
+    """Tokenize a book file (through the index cache unless cache_dir is None).
+
+    EPUB, HTML and Markdown books are converted to text first; only plain
+    text files go through the cache.
+    """
+    from utils.ingest import DOCUMENT_SUFFIXES, ingest
+
+    processor = TextProcessor()
+    if Path(path).suffix.lower() in DOCUMENT_SUFFIXES:
+        pages = queue.Queue()
+        processor.stream_pages(pages)
+        ingest(path, pages)
+    else:
+        if cache_dir is not None:
+            processor.cache = BookCache(cache_dir)
+        processor.stream_text(Path(path))
+    processor.wait_until_complete()
+    return processor
+
+
+def estimate_minutes(word_count, wpm):
+    return word_count / wpm
+
+
+def iter_schedule(processor, wpm):
+    """Yield (index, start_ms, word) for reading the book at a fixed wpm"""
+    ms_per_word = 60000 / wpm
+    for index, word in enumerate(processor.get_words()):
+        yield index, round(index * ms_per_word), word
+
+
+def export_schedule(processor, wpm, output, fmt="csv"):
+    """Write the display schedule of every word to an open text file"""
+    if fmt == "json":
+        # Written entry by entry so a large book is never held as one list
+        output.write("[")
+        for i, t, w in iter_schedule(processor, wpm):
+            output.write(("," if i else "") + json.dumps({'index': i, 'start_ms': t, 'word': w}))
+        output.write("]\n")
+        return
+    writer = csv.writer(output)
+    writer.writerow(['index', 'start_ms', 'word'])
+    writer.writerows(iter_schedule(processor, wpm))
+
+
+def cmd_tokenize(args):
+    start = time.perf_counter()
+    processor = load_book(args.file, None if args.no_cache else Path(args.cache_dir))
+    elapsed = time.perf_counter() - start
+    _, sentences, paragraphs = processor.get_index()
+    print(f"{processor.word_count()} words, {len(sentences)} sentences, "
+          f"{len(paragraphs)} paragraphs in {elapsed:.3f}s")
+
+
+def cmd_estimate(args):
+    processor = load_book(args.file, Path(args.cache_dir))
+    minutes = estimate_minutes(processor.word_count(), args.wpm)
+    print(f"{processor.word_count()} words: {int(minutes // 60)}h {minutes % 60:.0f}min at {args.wpm} WPM")
+
+
+def cmd_scrape(args):
+    from utils.batch_scrape import book_path_for
+    from utils.scrape import scrape_headway_book
+
+    output_path = Path(args.output) if args.output else book_path_for(args.url)
+    password = os.environ.get('HEADWAY_PASSWORD') or getpass.getpass("Headway password: ")
+    scrape_headway_book(args.email, password, args.url, output_path=output_path,
+                        backend=args.backend)
+    print(f"Book saved as {output_path}")
+
+
+def cmd_export(args):
+    processor = load_book(args.file, Path(args.cache_dir))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            export_schedule(processor, args.wpm, f, args.format)
+    else:
+        export_schedule(processor, args.wpm, sys.stdout, args.format)
+
+
+def cmd_lexicon(args):
+    from utils.lexicon import build_lexicon, count_corpus, read_frequency_list
+
+    if not args.list and not args.sources:
+        sys.exit("Give a frequency list (--list) and/or books to count words in")
+    start = time.perf_counter()
+    counts = count_corpus(args.sources)
+    for path in args.list:
+        counts.update(read_frequency_list(path))
+    words = build_lexicon(counts, Path(args.output), args.min_count)
+    print(f"{words} words written to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless speed reader")
+    parser.add_argument('--cache-dir', default="cache", help="tokenized index cache")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    tokenize = commands.add_parser('tokenize', help="tokenize a book and print its size")
+    tokenize.add_argument('file')
+    tokenize.add_argument('--no-cache', action='store_true')
+    tokenize.set_defaults(run=cmd_tokenize)
+
+    estimate = commands.add_parser('estimate', help="estimate the reading time of a book")
+    estimate.add_argument('file')
+    estimate.add_argument('--wpm', type=int, default=300)
+    estimate.set_defaults(run=cmd_estimate)
+
+    scrape = commands.add_parser('scrape', help="scrape a Headway book into books/")
+    scrape.add_argument('url')
+    scrape.add_argument('--email', required=True)
+    scrape.add_argument('--output')
+    scrape.add_argument('--backend', choices=['auto', 'http', 'selenium'], default='auto')
+    scrape.set_defaults(run=cmd_scrape)
+
+    export = commands.add_parser('export', help="export the word display schedule")
+    export.add_argument('file')
+    export.add_argument('--wpm', type=int, default=300)
+    export.add_argument('--format', choices=['csv', 'json'], default='csv')
+    export.add_argument('-o', '--output')
+    export.set_defaults(run=cmd_export)
+
+    lexicon = commands.add_parser('lexicon', help="build the word frequency lexicon used for pacing")
+    lexicon.add_argument('sources', nargs='*', help="book files or directories to count words in")
+    lexicon.add_argument('--list', action='append', default=[],
+                         help='frequency list with "word count" lines (repeatable)')
+    lexicon.add_argument('--min-count', type=int, default=2)
+    lexicon.add_argument('-o', '--output', default=str(Path("data") / "lexicon.bin"))
+    lexicon.set_defaults(run=cmd_lexicon)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    # Document parsing uses a process pool, which frozen builds need this for
+    multiprocessing.freeze_support()
+    main()
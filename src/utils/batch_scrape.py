@@ -0,0 +1,148 @@
+"""Scrape many Headway books at once on a bounded pool of browser workers.
+
+Usage: python -m utils.batch_scrape urls.txt --email me@example.com [--workers 4]
+
+The password is read from HEADWAY_PASSWORD or asked for. Run from src/.
+"""
+import argparse
+import getpass
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlparse
+
+from utils.scrape import base_url_of, get_session_pool, scrape_headway_book
+
+MAX_WORKERS = 8
+
+
+class HostRateLimiter:
+    """Spaces out page loads to the same host by at least min_interval seconds"""
+    def __init__(self, min_interval=0.5):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        # Sleep outside the lock so other hosts are not held up
+        if slot > now:
+            time.sleep(slot - now)
+
+    __call__ = wait
+
+
+class BatchProgress:
+    """Counts finished books and fetched pages and prints a throughput line per book"""
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.pages = 0
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def page(self):
+        with self._lock:
+            self.pages += 1
+
+    def finish(self, url, error=None):
+        with self._lock:
+            if error is None:
+                self.done += 1
+            else:
+                self.failed += 1
+            print(f"[{self.done + self.failed}/{self.total}] "
+                  f"{'failed' if error else 'done'} {url}"
+                  f"{f': {error}' if error else ''} - {self.summary()}")
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.done} ok, {self.failed} failed, {self.pages} pages in {elapsed:.1f}s "
+                f"({self.done * 60 / elapsed:.1f} books/min, {self.pages / elapsed:.1f} pages/s)")
+
+
+def book_path_for(book_url, output_dir=Path("books")):
+    """books/<name>.txt, named like the GUI names scraped books"""
+    parts = [p for p in urlparse(book_url).path.split('/') if p]
+    name = parts[-2] if len(parts) >= 2 else (parts[-1] if parts else "book")
+    return Path(output_dir) / f"{name}.txt"
+
+
+def scrape_books(email, password, book_urls, output_dir=Path("books"), workers=2,
+                 max_workers=MAX_WORKERS, retries=3, backoff=2.0, min_interval=0.5,
+                 scrape=scrape_headway_book):
+    """Scrape book_urls concurrently; return {url: path or the last exception}.
+
+    Each worker holds one browser session from the shared per-site pool, so
+    logins are reused across books. A failed book is retried with
+    exponential backoff and resumes from its scrape checkpoint.
+    """
+    book_urls = list(dict.fromkeys(book_urls))
+    workers = max(1, min(workers, max_workers, len(book_urls) or 1))
+    limiter = HostRateLimiter(min_interval)
+    progress = BatchProgress(len(book_urls))
+    # Keep one warm session per worker instead of the pool's usual two
+    for base_url in {base_url_of(url) for url in book_urls}:
+        pool = get_session_pool(base_url)
+        pool.max_idle = max(pool.max_idle, workers)
+
+    def run(url):
+        output_path = book_path_for(url, output_dir)
+        for attempt in range(retries + 1):
+            try:
+                # Pages restored from the checkpoint on a retry are not counted again
+                return scrape(email, password, url, output_path=output_path,
+                              on_fetched=lambda text: progress.page(), throttle=limiter)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                print(f"Retrying {url} in {delay:.1f}s after: {str(e)}")
+                time.sleep(delay)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run, url): url for url in book_urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                results[url] = future.result()
+                progress.finish(url)
+            except Exception as e:
+                results[url] = e
+                progress.finish(url, e)
+    print(f"Batch finished: {progress.summary()}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape a list of Headway book URLs")
+    parser.add_argument('urls', help="file with one book URL per line")
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--output-dir', default="books")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--min-interval', type=float, default=0.5,
+                        help="minimum seconds between page loads per host")
+    args = parser.parse_args()
+
+    with open(args.urls, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    password = os.environ.get('HEADWAY_PASSWORD') or getpass.getpass("Headway password: ")
+    results = scrape_books(args.email, password, urls, Path(args.output_dir), args.workers,
+                           args.max_workers, args.retries, min_interval=args.min_interval)
+    if any(isinstance(result, Exception) for result in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from utils.text_processor import TOKENIZER_VERSION
+
+# magic, format version, word count, sentence count, paragraph count
+_HEADER = struct.Struct('<4sIQQQ')
+_MAGIC = b'SRIX'
+_FORMAT_VERSION = 1
+_ITEM_TYPE = 'I'
+
+
+class BookCache:
+    """Size-bounded on-disk cache of pre-tokenized book indexes.
+
+    Each entry holds the word start offsets and the sentence and paragraph
+    boundaries of one book, keyed by content hash and tokenizer version,
+    plus its pace weights (utils/timing.py) once they were computed.
+    Entries are memory-mapped on load, and the least recently used ones are
+    evicted once the cache grows past max_bytes.
+    """
+    def __init__(self, cache_dir=Path("cache"), max_bytes=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(exist_ok=True)
+
+    def key_for(self, buffer):
+        """Return the cache key of a str or bytes-like book buffer"""
+        if isinstance(buffer, str):
+            buffer = buffer.encode('utf-8')
+        digest = hashlib.blake2b(buffer, digest_size=16).hexdigest()
+        return f"{digest}-t{TOKENIZER_VERSION}"
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.idx"
+
+    def _pace_path(self, key, variant=""):
+        from utils.timing import TIMING_VERSION
+        return self.cache_dir / f"{key}-p{TIMING_VERSION}{variant}.pace"
+
+    def load(self, key):
+        """Return (starts, sentences, paragraphs) memory-mapped views, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, version, *counts = _HEADER.unpack_from(mapped)
+        except struct.error:
+            return None
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            return None
+        item_size = array(_ITEM_TYPE).itemsize
+        if len(mapped) != _HEADER.size + sum(counts) * item_size or sys.byteorder != 'little':
+            return None
+
+        # Mark as recently used for the LRU eviction
+        os.utime(path)
+        view = memoryview(mapped)
+        arrays = []
+        offset = _HEADER.size
+        for count in counts:
+            end = offset + count * item_size
+            arrays.append(view[offset:end].cast(_ITEM_TYPE))
+            offset = end
+        return tuple(arrays)
+
+    def store(self, key, starts, sentences, paragraphs):
+        """Write an index atomically and evict old entries if needed"""
+        if sys.byteorder != 'little':
+            return
+        path = self._path(key)
+        temp_path = path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION,
+                                     len(starts), len(sentences), len(paragraphs)))
+                for values in (starts, sentences, paragraphs):
+                    f.write(memoryview(values).cast('B'))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error caching book index: {str(e)}")
+            return
+        self.evict()
+
+    def load_pace(self, key, word_count, variant=""):
+        """Return the cached per-word pace weights of a book, or None.
+
+        variant tells apart weights built with different settings, e.g. lexicons.
+        """
+        path = self._pace_path(key, variant)
+        weights = array('f')
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size != word_count * weights.itemsize:
+                    return None
+                weights.fromfile(f, word_count)
+        except (OSError, EOFError):
+            return None
+        if sys.byteorder != 'little':
+            weights.byteswap()
+        os.utime(path)
+        return weights
+
+    def store_pace(self, key, weights, variant=""):
+        """Write the pace weights of a book next to its index"""
+        if sys.byteorder != 'little':
+            weights = array('f', weights)
+            weights.byteswap()
+        path = self._pace_path(key, variant)
+        temp_path = path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'wb') as f:
+                weights.tofile(f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error caching pace schedule: {str(e)}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(('.idx', '.pace')):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # Still mapped on Windows; try again on the next store
+                pass
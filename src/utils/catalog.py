@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from utils.progress_store import PROGRESS_TABLE_SQL, canonical_path
+from utils.text_processor import _word_re_for
+
+TEXT_SUFFIXES = ('.txt',)
+
+
+def count_words(path, block_size=1 << 20):
+    """Count the words TextProcessor would find without tokenizing the whole book"""
+    count = 0
+    carry = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = carry + block
+            # Keep a word cut at the block end for the next block
+            cut = len(block)
+            while cut and not block[cut - 1:cut].isspace():
+                cut -= 1
+            count += len(_word_re_for(block).findall(block, 0, cut))
+            carry = block[cut:]
+    return count + len(_word_re_for(carry).findall(carry))
+
+
+def count_document_words(path):
+    """Count the words of an EPUB, HTML or Markdown book after stripping the markup"""
+    from utils.ingest import iter_text
+
+    return sum(len(piece.split()) for piece in iter_text(path, workers=0))
+
+
+class LibraryCatalog:
+    """Catalog of the books directory, kept next to the reading progress.
+
+    Every book's size and mtime are stored with its word count, so a rescan
+    only stats the files and re-counts the ones that changed. Queries join
+    the catalog with the progress table of utils.progress_store.
+    """
+    def __init__(self, books_dir=Path("books"), db_path=Path("saves") / "progress.db"):
+        self.books_dir = Path(books_dir)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS books (
+                                path TEXT PRIMARY KEY,
+                                name TEXT NOT NULL,
+                                size INTEGER NOT NULL,
+                                mtime_ns INTEGER NOT NULL,
+                                word_count INTEGER NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS books_name ON books(name COLLATE NOCASE)")
+            # The progress table normally comes from ProgressStore
+            conn.execute(PROGRESS_TABLE_SQL)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _walk(self, directory, suffixes):
+        """Yield (path, stat) of every book file under directory"""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._walk(entry.path, suffixes)
+            elif entry.name.lower().endswith(suffixes):
+                yield entry.path, entry.stat()
+
+    def scan(self):
+        """Bring the catalog up to date; returns (added_or_changed, removed)"""
+        from utils.ingest import DOCUMENT_SUFFIXES
+
+        start = time.perf_counter()
+        conn = self._connection()
+        known = {path: (size, mtime_ns) for path, size, mtime_ns
+                 in conn.execute("SELECT path, size, mtime_ns FROM books")}
+        changed = []
+        seen = set()
+        # Walking the resolved directory yields canonical paths without
+        # resolving every file on its own
+        for file_path, stat in self._walk(canonical_path(self.books_dir), TEXT_SUFFIXES + DOCUMENT_SUFFIXES):
+            path = os.path.normcase(file_path)
+            seen.add(path)
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                try:
+                    if file_path.lower().endswith(TEXT_SUFFIXES):
+                        word_count = count_words(file_path)
+                    else:
+                        word_count = count_document_words(file_path)
+                except Exception as e:
+                    # A broken book must not stop the scan
+                    print(f"Could not index {file_path}: {str(e)}")
+                    continue
+                changed.append((path, Path(file_path).stem, stat.st_size, stat.st_mtime_ns, word_count))
+        removed = [(path,) for path in known if path not in seen]
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?, ?)", changed)
+            conn.executemany("DELETE FROM books WHERE path = ?", removed)
+        print(f"Library scan: {len(seen)} books, {len(changed)} indexed, {len(removed)} removed "
+              f"in {time.perf_counter() - start:.3f}s")
+        return len(changed), len(removed)
+
+    def query(self, text="", wpm=300, limit=500):
+        """Return matching books as dicts, most recently read first"""
+        rows = self._connection().execute(
+            """SELECT b.path, b.name, b.word_count, COALESCE(p.position, 0), p.updated
+               FROM books b LEFT JOIN progress p ON p.path = b.path
+               WHERE b.name LIKE ? ESCAPE '\\'
+               ORDER BY p.updated IS NULL, p.updated DESC, b.name COLLATE NOCASE
+               LIMIT ?""",
+            ('%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%', limit))
+        books = []
+        for path, name, word_count, position, updated in rows:
+            books.append({
+                'path': path,
+                'name': name,
+                'word_count': word_count,
+                'minutes': word_count / wpm if wpm else 0.0,
+                'minutes_left': max(0, word_count - position) / wpm if wpm else 0.0,
+                'position': position,
+                'progress': min(1.0, position / word_count) if word_count else 0.0,
+                'last_read': updated,
+            })
+        return books
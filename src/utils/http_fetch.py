@@ -0,0 +1,244 @@
+import gzip
+import http.client
+import queue
+import threading
+import zlib
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlparse
+
+
+class HttpFetchError(Exception):
+    """The plain HTTP path cannot handle this page; use the browser instead"""
+
+
+class HttpSession:
+    """Cookie-carrying HTTP client with a small pool of keep-alive connections.
+
+    Much lighter than a browser for pages whose content is in the HTML the
+    server sends. Connections are reused across requests and threads, and
+    redirects are followed by hand so cookies set on the way are kept.
+    """
+    def __init__(self, base_url, max_connections=4, timeout=15.0):
+        parts = urlparse(base_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.cookies = {}
+        self.requests = 0
+        self.connections_opened = 0
+        self._idle = queue.LifoQueue(maxsize=max_connections)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        with self._lock:
+            self.connections_opened += 1
+        if self.https:
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def set_cookies(self, cookies):
+        """Take cookies in the format Selenium's get_cookies() returns"""
+        with self._lock:
+            for cookie in cookies:
+                self.cookies[cookie['name']] = cookie['value']
+
+    def get_cookies(self):
+        """Return the cookies in the format Selenium's add_cookie() accepts"""
+        with self._lock:
+            return [{'name': name, 'value': value, 'path': '/'}
+                    for name, value in self.cookies.items()]
+
+    def _store_cookies(self, response):
+        with self._lock:
+            for header in response.msg.get_all('Set-Cookie') or []:
+                name, _, rest = header.partition('=')
+                self.cookies[name.strip()] = rest.split(';', 1)[0].strip()
+
+    def _send(self, method, path, body, headers):
+        """One request/response on a pooled connection, retried once on a stale socket"""
+        with self._lock:
+            cookie = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        headers = dict(headers or {}, **{'Accept-Encoding': 'gzip, deflate'})
+        if cookie:
+            headers['Cookie'] = cookie
+        for attempt in range(2):
+            conn = self._checkout()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                conn.close()
+                # The server may have closed an idle keep-alive connection
+                if attempt:
+                    raise HttpFetchError(f"{method} {path} failed: {str(e)}")
+                continue
+            except OSError as e:
+                # Timeouts, DNS and SSL errors; the browser may still get through
+                conn.close()
+                raise HttpFetchError(f"{method} {path} failed: {str(e)}")
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            with self._lock:
+                self.requests += 1
+            self._store_cookies(response)
+            encoding = response.getheader('Content-Encoding', '')
+            try:
+                if encoding == 'gzip':
+                    data = gzip.decompress(data)
+                elif encoding == 'deflate':
+                    data = zlib.decompress(data)
+            except (OSError, EOFError, zlib.error) as e:
+                raise HttpFetchError(f"Bad {encoding} body from {path}: {str(e)}")
+            return response, data
+
+    def request(self, method, url, body=None, headers=None, max_redirects=5):
+        """Return (final_url, status, text), following redirects"""
+        url = urljoin(self.base_url + "/", url)
+        for _ in range(max_redirects + 1):
+            parts = urlparse(url)
+            if parts.netloc != self.host:
+                raise HttpFetchError(f"Redirected off site to {url}")
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            response, data = self._send(method, path, body, headers)
+            location = response.getheader('Location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                if response.status in (301, 302, 303):
+                    method, body, headers = 'GET', None, None
+                continue
+            charset = response.msg.get_content_charset() or 'utf-8'
+            return url, response.status, data.decode(charset, 'replace')
+        raise HttpFetchError(f"Too many redirects from {url}")
+
+    def get(self, url):
+        return self.request('GET', url)
+
+    def form_login(self, email, password, login_path="/login"):
+        """Post the login form directly; return True if the site accepted it"""
+        body = urlencode({'email': email, 'password': password})
+        try:
+            url, status, _ = self.request(
+                'POST', login_path, body=body,
+                headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        except HttpFetchError:
+            return False
+        return status < 400 and "/login" not in urlparse(url).path
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SummaryPageParser(HTMLParser):
+    """Pulls the summary text and the next-page link out of a page's HTML.
+
+    content_classes are the CSS classes of the content element; the text is
+    flattened roughly like innerText, with block elements on new lines.
+    """
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                  'section', 'article', 'blockquote', 'tr'}
+    VOID_TAGS = {'br', 'img', 'input', 'meta', 'link', 'hr', 'source', 'wbr'}
+
+    def __init__(self, content_classes, next_icon_prefix):
+        super().__init__(convert_charrefs=True)
+        self.content_classes = set(content_classes)
+        self.next_icon_prefix = next_icon_prefix
+        self.parts = []
+        self.next_link = None
+        # The next-page icon was seen, whether or not its target is readable
+        self.has_next = False
+        self._depth = 0
+        self._content_depth = None
+        self._skip_depth = None
+        self._link_stack = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag not in self.VOID_TAGS:
+            self._depth += 1
+        if tag in ('script', 'style') and self._skip_depth is None:
+            self._skip_depth = self._depth
+        if self._content_depth is None and not self.parts:
+            if self.content_classes <= set((attrs.get('class') or '').split()):
+                self._content_depth = self._depth
+        elif self._content_depth is not None and tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+        if tag in ('a', 'button'):
+            self._link_stack.append((self._depth, _link_target(attrs)))
+        if tag == 'path' and self.next_link is None:
+            if (attrs.get('d') or '').startswith(self.next_icon_prefix):
+                self.has_next = True
+                if self._link_stack:
+                    self.next_link = self._link_stack[-1][1]
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID_TAGS:
+            return
+        if self._link_stack and self._link_stack[-1][0] == self._depth:
+            self._link_stack.pop()
+        if self._skip_depth == self._depth:
+            self._skip_depth = None
+        if self._content_depth == self._depth:
+            self._content_depth = None
+        self._depth -= 1
+
+    def handle_data(self, data):
+        if self._content_depth is not None and self._skip_depth is None:
+            self.parts.append(data)
+
+    def text(self):
+        lines = (" ".join(line.split()) for line in "".join(self.parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def _link_target(attrs):
+    """Return the URL a link or button goes to, if it can be read from the HTML"""
+    if attrs.get('href'):
+        return attrs['href']
+    onclick = attrs.get('onclick') or ''
+    for quote in ("'", '"'):
+        marker = "location.href=" + quote
+        if marker in onclick:
+            return onclick.split(marker, 1)[1].split(quote, 1)[0]
+    return None
+
+
+def parse_summary_page(html, content_classes, next_icon_prefix):
+    """Return (text, next_link) for a summary page; either can be empty/None.
+
+    next_link is None only on the last page. A next button that navigates
+    through script instead of a readable link raises HttpFetchError, since
+    only the browser can follow it.
+    """
+    parser = SummaryPageParser(content_classes, next_icon_prefix)
+    parser.feed(html)
+    parser.close()
+    if parser.has_next and not parser.next_link:
+        raise HttpFetchError("The next page button has no link the HTTP path can follow")
+    return parser.text(), parser.next_link
@@ -0,0 +1,263 @@
+import codecs
+import posixpath
+import re
+import zipfile
+from html.parser import HTMLParser
+from itertools import repeat
+from pathlib import Path
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+# Formats read through this module; plain .txt files are memory-mapped by TextProcessor
+DOCUMENT_SUFFIXES = ('.epub', '.html', '.htm', '.xhtml', '.md', '.markdown')
+# EPUBs with at least this much markup are parsed in a process pool
+PARALLEL_MIN_BYTES = 2 << 20
+# Extracted text is handed on in pieces of about this many characters
+PIECE_CHARS = 64 * 1024
+READ_SIZE = 256 * 1024
+
+# Tags that start or end a paragraph
+_BLOCK_TAGS = frozenset("""
+    address article aside blockquote body caption dd div dl dt figcaption figure
+    footer h1 h2 h3 h4 h5 h6 header hr li main ol p pre section table td th tr ul
+""".split())
+# Tags whose contents are never read
+_SKIP_TAGS = frozenset(('head', 'script', 'style', 'template', 'noscript', 'svg', 'math'))
+
+_CONTAINER_NS = '{urn:oasis:names:tc:opendocument:xmlns:container}'
+_OPF_NS = '{http://www.idpf.org/2007/opf}'
+
+_MD_FENCE_RE = re.compile(r'^\s*(```|~~~)')
+_MD_HEADING_RE = re.compile(r'^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$')
+_MD_RULE_RE = re.compile(r'^\s{0,3}([-*_])(\s*\1){2,}\s*$')
+_MD_REFERENCE_RE = re.compile(r'^\s{0,3}\[[^\]]+\]:\s')
+_MD_PREFIX_RE = re.compile(r'^\s*(?:>\s?)*(?:[-*+]\s+|\d+[.)]\s+)?')
+_MD_LIST_ITEM_RE = re.compile(r'^\s*(?:>\s?)*(?:[-*+]|\d+[.)])\s+')
+_MD_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])')
+_MD_MARKUP_RE = re.compile(r'<[^>\n]+>|`+|\*+|~~|(?<!\w)_+|_+(?!\w)')
+
+
+class TextExtractor(HTMLParser):
+    """Turns HTML fed in pieces into plain text paragraphs.
+
+    Markup can be fed in arbitrary pieces; pop_text() returns the
+    paragraphs finished so far, joined by blank lines.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip = 0
+        self._current = []
+        self._done = []
+        self.pending_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self._end_paragraph()
+        elif tag == 'br':
+            self._current.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in _BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._current.append(data)
+
+    def _end_paragraph(self):
+        text = ' '.join(''.join(self._current).split())
+        self._current = []
+        if text:
+            self._done.append(text)
+            self.pending_chars += len(text)
+
+    def pop_text(self):
+        text = '\n\n'.join(self._done)
+        self._done = []
+        self.pending_chars = 0
+        return text
+
+    def close(self):
+        super().close()
+        self._end_paragraph()
+
+
+def html_to_text(markup):
+    """Return the text of an HTML document, one paragraph per block"""
+    extractor = TextExtractor()
+    extractor.feed(markup)
+    extractor.close()
+    return extractor.pop_text()
+
+
+def iter_html(path):
+    """Yield the text of an HTML file in pieces, reading it block by block"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')('replace')
+    extractor = TextExtractor()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(READ_SIZE)
+            extractor.feed(decoder.decode(block, final=not block))
+            if not block:
+                break
+            if extractor.pending_chars >= PIECE_CHARS:
+                yield extractor.pop_text()
+    extractor.close()
+    text = extractor.pop_text()
+    if text:
+        yield text
+
+
+def _markdown_line(line):
+    line = _MD_PREFIX_RE.sub('', line, count=1)
+    line = _MD_IMAGE_RE.sub(r'\1', line)
+    line = _MD_LINK_RE.sub(r'\1', line)
+    return _MD_MARKUP_RE.sub('', line).strip()
+
+
+def iter_markdown(path):
+    """Yield the text of a Markdown file in pieces, without the markup"""
+    paragraphs = []
+    paragraph = []
+    size = 0
+    in_code = False
+
+    def end_paragraph():
+        nonlocal size
+        if paragraph:
+            text = ' '.join(paragraph)
+            paragraphs.append(text)
+            size += len(text)
+            paragraph.clear()
+
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        for line in f:
+            if _MD_FENCE_RE.match(line):
+                in_code = not in_code
+                end_paragraph()
+                continue
+            if in_code:
+                if line.strip():
+                    paragraph.append(line.strip())
+                continue
+            heading = _MD_HEADING_RE.match(line)
+            if heading:
+                # Headings are paragraphs of their own
+                end_paragraph()
+                paragraph.append(_markdown_line(heading.group(1)))
+                end_paragraph()
+            elif not line.strip() or _MD_RULE_RE.match(line):
+                end_paragraph()
+            elif not _MD_REFERENCE_RE.match(line):
+                if _MD_LIST_ITEM_RE.match(line):
+                    # Every list item gets a paragraph
+                    end_paragraph()
+                text = _markdown_line(line)
+                if text:
+                    paragraph.append(text)
+            if size >= PIECE_CHARS:
+                yield '\n\n'.join(paragraphs)
+                paragraphs = []
+                size = 0
+    end_paragraph()
+    if paragraphs:
+        yield '\n\n'.join(paragraphs)
+
+
+def epub_chapters(book):
+    """Return the archive names of the chapters of an open EPUB zip in reading order"""
+    try:
+        container = ElementTree.fromstring(book.read('META-INF/container.xml'))
+        rootfile = container.find(f'.//{_CONTAINER_NS}rootfile').get('full-path')
+        package = ElementTree.fromstring(book.read(rootfile))
+    except (KeyError, AttributeError, ElementTree.ParseError):
+        # No usable package document; fall back to the archive order
+        return [name for name in book.namelist() if name.lower().endswith(('.xhtml', '.html', '.htm'))]
+    base = posixpath.dirname(rootfile)
+    manifest = {item.get('id'): item for item in package.iter(f'{_OPF_NS}item')}
+    names = set(book.namelist())
+    chapters = []
+    for itemref in package.iter(f'{_OPF_NS}itemref'):
+        item = manifest.get(itemref.get('idref'))
+        if item is None or 'html' not in item.get('media-type', ''):
+            continue
+        name = posixpath.normpath(posixpath.join(base, unquote(item.get('href', '').split('#')[0])))
+        if name in names:
+            chapters.append(name)
+    return chapters
+
+
+def _chapter_text(book, name):
+    return html_to_text(book.read(name).decode('utf-8', 'replace'))
+
+
+def epub_chapter_text(path, name):
+    """Return the text of one chapter; runs in the worker processes"""
+    with zipfile.ZipFile(path) as book:
+        return _chapter_text(book, name)
+
+
+def iter_epub(path, workers=None):
+    """Yield the text of every chapter of an EPUB in reading order.
+
+    Large books are parsed in a process pool of `workers` processes
+    (default: one per CPU); chapters still come out in order, each one as
+    soon as it and the ones before it are done. workers=0 parses inline.
+    """
+    with zipfile.ZipFile(path) as book:
+        chapters = epub_chapters(book)
+        markup_bytes = sum(book.getinfo(name).file_size for name in chapters)
+        if workers == 0 or len(chapters) < 2 or markup_bytes < PARALLEL_MIN_BYTES:
+            for name in chapters:
+                text = _chapter_text(book, name)
+                if text:
+                    yield text
+            return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(workers)
+    try:
+        for text in pool.map(epub_chapter_text, repeat(str(path)), chapters):
+            if text:
+                yield text
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_text(path, workers=None):
+    """Yield the plain text of an EPUB, HTML or Markdown file in pieces"""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.epub':
+        return iter_epub(path, workers)
+    if suffix in ('.html', '.htm', '.xhtml'):
+        return iter_html(path)
+    if suffix in ('.md', '.markdown'):
+        return iter_markdown(path)
+    raise ValueError(f"Unsupported book format: {suffix}")
+
+
+def ingest(path, pages, workers=None, cancelled=None, on_error=None):
+    """Put the text of a document on a queue for TextProcessor.stream_pages.
+
+    The first piece is readable as soon as it is parsed. None is always put
+    last to end the stream; cancelled() returning True stops early. A file
+    that cannot be parsed (a corrupt EPUB, say) ends the stream where it
+    broke and the error goes to on_error, or is raised without one.
+    """
+    try:
+        for text in iter_text(path, workers):
+            if cancelled is not None and cancelled():
+                break
+            pages.put(text)
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(e)
+    finally:
+        pages.put(None)
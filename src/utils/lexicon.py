@@ -0,0 +1,229 @@
+import hashlib
+import math
+import mmap
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+from utils.search_index import normalize
+
+DEFAULT_PATH = Path("data") / "lexicon.bin"
+
+# magic, format version, word count, blob length
+_HEADER = struct.Struct('<4sIQQ')
+_MAGIC = b'SRLX'
+_FORMAT_VERSION = 1
+
+# Zipf frequency (log10 of occurrences per billion words) from which a word is easy
+EASY_ZIPF = 5.0
+# Extra display time per Zipf point below EASY_ZIPF, and its cap
+RARE_STEP = 0.12
+MAX_RARE_BONUS = 0.6
+# Assumed for words the lexicon does not know (names, numbers, typos)
+UNKNOWN_ZIPF = 2.5
+# Zipf values are stored as one byte in tenths
+_ZIPF_UNITS = 10
+
+
+def zipf_multiplier(zipf):
+    """Display time factor of a word with the given Zipf frequency"""
+    return 1.0 + min(MAX_RARE_BONUS, RARE_STEP * max(0.0, EASY_ZIPF - zipf))
+
+
+class _Words:
+    """Sequence view of the sorted words in a mapped lexicon, for bisect"""
+    def __init__(self, mapped, offsets, blob_start):
+        self._mapped = mapped
+        self._offsets = offsets
+        self._blob_start = blob_start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        start = self._blob_start
+        # Every word is followed by a newline
+        return self._mapped[start + self._offsets[index]:start + self._offsets[index + 1] - 1]
+
+    def all(self):
+        start = self._blob_start
+        return self._mapped[start:start + self._offsets[-1]].split(b'\n')[:-1]
+
+
+class Lexicon:
+    """Word frequency table in a compact binary file, memory-mapped on first use.
+
+    The file holds the UTF-8 words in byte order, one per line, their
+    offsets as array('I') and one byte per word with its Zipf frequency.
+    Nothing is read until the first lookup; single words are found by
+    binary search in the mapped file and a whole book is looked up at once
+    by multipliers(). Build the file with build_lexicon() (see
+    `speedreader.py lexicon`); without it pacing ignores word frequency.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._loaded = False
+        self._words = None
+        self._scores = None
+        self._tag = ""
+
+    def _load(self):
+        if self._loaded:
+            return self._words is not None
+        self._loaded = True
+        try:
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, blob_length = _HEADER.unpack_from(mapped)
+        except (OSError, ValueError, struct.error):
+            return False
+        offsets_start = _HEADER.size
+        scores_start = offsets_start + (count + 1) * 4
+        blob_start = scores_start + count
+        if (magic != _MAGIC or version != _FORMAT_VERSION or sys.byteorder != 'little'
+                or len(mapped) != blob_start + blob_length):
+            print(f"Ignoring invalid lexicon {self.path}")
+            return False
+        view = memoryview(mapped)
+        self._words = _Words(mapped, view[offsets_start:scores_start].cast('I'), blob_start)
+        self._scores = view[scores_start:blob_start]
+        self._tag = "-l" + hashlib.blake2b(mapped, digest_size=4).hexdigest()
+        return True
+
+    def available(self):
+        return self._load()
+
+    def tag(self):
+        """Short content hash, to tell schedules built with other lexicons apart"""
+        self._load()
+        return self._tag
+
+    def __len__(self):
+        return len(self._words) if self._load() else 0
+
+    def zipf(self, word):
+        """Return the Zipf frequency of a word, or None if it is unknown"""
+        if not self._load():
+            return None
+        term = normalize(word).encode('utf-8')
+        i = bisect_left(self._words, term)
+        if i < len(self._words) and self._words[i] == term:
+            return self._scores[i] / _ZIPF_UNITS
+        return None
+
+    def multipliers(self, words):
+        """Return {word: display time factor} for an iterable of raw words.
+
+        Many words (a book) are matched against a temporary dict of the
+        whole lexicon, a few by searching the sorted file, each search
+        starting where the previous one ended.
+        """
+        if not self._load():
+            return {word: 1.0 for word in words}
+        terms = {}
+        for word in words:
+            terms.setdefault(normalize(word).encode('utf-8'), []).append(word)
+        table = self._words
+        scores = self._scores
+        size = len(table)
+        # Factor of every stored Zipf value
+        factor_of = [zipf_multiplier(score / _ZIPF_UNITS) for score in range(256)]
+        unknown = zipf_multiplier(UNKNOWN_ZIPF)
+        factors = {}
+        if len(terms) * 16 > size:
+            known = dict(zip(table.all(), scores))
+            for term, raw in terms.items():
+                score = known.get(term)
+                factor = 1.0 if not term else unknown if score is None else factor_of[score]
+                for word in raw:
+                    factors[word] = factor
+            return factors
+        lo = 0
+        for term in sorted(terms):
+            # Gallop forward from the last match, then bisect the bracket
+            step = 1
+            hi = lo
+            while hi < size and table[hi] < term:
+                lo = hi + 1
+                hi += step
+                step *= 2
+            i = bisect_left(table, term, lo, min(hi, size))
+            lo = i
+            if not term:
+                factor = 1.0
+            elif i < size and table[i] == term:
+                factor = factor_of[scores[i]]
+            else:
+                factor = unknown
+            for word in terms[term]:
+                factors[word] = factor
+        return factors
+
+
+def build_lexicon(counts, path=DEFAULT_PATH, min_count=1):
+    """Write a lexicon file from {word: occurrences}"""
+    merged = Counter()
+    for word, count in counts.items():
+        term = normalize(word)
+        if term:
+            merged[term] += count
+    total = sum(merged.values())
+    items = sorted((term.encode('utf-8'), count) for term, count in merged.items() if count >= min_count)
+    offsets = array('I', [0])
+    scores = bytearray()
+    blob = bytearray()
+    for term, count in items:
+        blob += term + b'\n'
+        offsets.append(len(blob))
+        zipf = math.log10(count * 1e9 / total)
+        scores.append(max(0, min(255, round(zipf * _ZIPF_UNITS))))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(items), len(blob)))
+        f.write(offsets.tobytes())
+        f.write(scores)
+        f.write(blob)
+    temp_path.replace(path)
+    return len(items)
+
+
+def read_frequency_list(path):
+    """Read "word count" lines (space, tab or comma separated) into a Counter"""
+    counts = Counter()
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        for line in f:
+            parts = re.split(r'[\s,]+', line.strip())
+            if len(parts) >= 2:
+                try:
+                    counts[parts[0]] += int(float(parts[1]))
+                except ValueError:
+                    continue
+    return counts
+
+
+def count_corpus(paths):
+    """Count the words of book files and of the books in directories"""
+    from utils.ingest import DOCUMENT_SUFFIXES, iter_text
+
+    counts = Counter()
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path])
+    for path in files:
+        suffix = path.suffix.lower()
+        if suffix == '.txt':
+            with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+                for line in f:
+                    counts.update(line.split())
+        elif suffix in DOCUMENT_SUFFIXES:
+            for piece in iter_text(path, workers=0):
+                counts.update(piece.split())
+    return counts
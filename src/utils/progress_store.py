@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA_VERSION = 1
+# Bytes hashed from each end of a book; enough to tell books apart without
+# reading a large file in full
+_HASH_SPAN = 1 << 20
+
+PROGRESS_TABLE_SQL = """CREATE TABLE IF NOT EXISTS progress (
+                            path TEXT PRIMARY KEY,
+                            content_hash TEXT,
+                            position INTEGER NOT NULL,
+                            updated REAL NOT NULL)"""
+
+
+def canonical_path(path):
+    return os.path.normcase(str(Path(path).resolve()))
+
+
+def content_hash(path):
+    """Hash of a book's size and its first and last MB"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, 'little'))
+        digest.update(f.read(_HASH_SPAN))
+        if size > _HASH_SPAN:
+            f.seek(max(_HASH_SPAN, size - _HASH_SPAN))
+            digest.update(f.read(_HASH_SPAN))
+    return digest.hexdigest()
+
+
+class ProgressStore:
+    """Reading positions of all books in one SQLite database (WAL mode).
+
+    Rows are keyed by canonical path and indexed by content hash, so a moved
+    or renamed book still finds its position. checkpoint() only queues the
+    position; a background thread writes all queued positions in one
+    transaction at most every `debounce` seconds, so callers never wait on
+    the disk. The old saves/*_save.json files are imported once.
+    """
+    def __init__(self, db_path=Path("saves") / "progress.db", debounce=3.0, legacy_dir=None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.debounce = debounce
+        self._local = threading.local()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._migrate(self.db_path.parent if legacy_dir is None else Path(legacy_dir))
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connection(self):
+        """One connection per thread; WAL lets readers and the writer overlap"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, legacy_dir):
+        conn = self._connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= _SCHEMA_VERSION:
+            return
+        with conn:
+            conn.execute(PROGRESS_TABLE_SQL)
+            conn.execute("CREATE INDEX IF NOT EXISTS progress_hash ON progress(content_hash)")
+            for save_file in legacy_dir.glob("*_save.json"):
+                try:
+                    with open(save_file, 'r', encoding='utf-8') as f:
+                        save_data = json.load(f)
+                    path = save_data['file_path']
+                    book_hash = content_hash(path) if os.path.exists(path) else None
+                    conn.execute("INSERT OR IGNORE INTO progress VALUES (?, ?, ?, ?)",
+                                 (canonical_path(path), book_hash, int(save_data.get('position', 0)),
+                                  float(save_data.get('timestamp', 0) or 0)))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not import {save_file.name}: {str(e)}")
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+
+    def lookup(self, path, book_hash=None):
+        """Return the saved position of a book (0 if none), by path or content hash"""
+        path = canonical_path(path)
+        with self._lock:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return pending[1]
+        conn = self._connection()
+        row = conn.execute("SELECT position FROM progress WHERE path = ?", (path,)).fetchone()
+        if row is None and book_hash is not None:
+            row = conn.execute("SELECT position FROM progress WHERE content_hash = ? "
+                               "ORDER BY updated DESC LIMIT 1", (book_hash,)).fetchone()
+        return row[0] if row else 0
+
+    def positions(self):
+        """Return {canonical path: position} of every saved book"""
+        rows = self._connection().execute("SELECT path, position FROM progress")
+        positions = dict(rows.fetchall())
+        with self._lock:
+            positions.update((path, position) for path, (_, position, _) in self._pending.items())
+        return positions
+
+    def checkpoint(self, path, position, book_hash=None):
+        """Queue a position for writing; returns immediately"""
+        with self._lock:
+            self._pending[canonical_path(path)] = (book_hash, int(position), time.time())
+        self._wake.set()
+
+    def flush(self):
+        """Write all queued positions now"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                """INSERT INTO progress (path, content_hash, position, updated) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(path) DO UPDATE SET
+                       content_hash = COALESCE(excluded.content_hash, content_hash),
+                       position = excluded.position, updated = excluded.updated""",
+                [(path, book_hash, position, updated)
+                 for path, (book_hash, position, updated) in pending.items()])
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            # Collect the positions of the next few seconds into one write
+            time.sleep(self.debounce)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error saving progress: {str(e)}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
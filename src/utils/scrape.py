@@ -1,124 +1,308 @@
-import tkinter as tk
-from tkinter import ttk
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.common import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Selenium is imported inside the functions that drive a browser, so the
+# HTTP backend and the app start without loading it
 import time
 import traceback
 import threading
 import sys
 import os
+from functools import partial
+from urllib.parse import urljoin, urlparse
+from utils.session_pool import SessionPool
+from utils.http_fetch import HttpFetchError, HttpSession, parse_summary_page
+from utils.waits import LatencyTracker
+from utils.scrape_checkpoint import ScrapeCheckpoint
 
-def scrape_headway_book(email, password, book_url):
-    """Scrape a book from Headway using provided credentials"""
-    # Constants
-    SUMMARY_CONTENT_SELECTOR = ".MuiStack-root.mui-style-mhauuz"
-    NEXT_PAGE_BUTTON_SELECTOR = """
-        button.MuiButtonBase-root.MuiButton-root:has(svg path[d^="M16.6141 11"]),
-        button[class*="MuiButton-root"]:has(svg path[d^="M16.6141"])
-    """
-    
-    driver = None
-    all_summary_text = []
-    page_count = 1
-    
-    try:
-        # Configure Chrome options
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1920,1080')
-
-        # Get ChromeDriver path
-        if getattr(sys, 'frozen', False):
-            # If running as compiled executable
-            chromedriver_path = os.path.join(sys._MEIPASS, 'chromedriver.exe')
-        else:
-            # If running from source
-            chromedriver_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                'drivers',
-                'chromedriver.exe'
-            )
-
-        if not os.path.exists(chromedriver_path):
-            raise Exception(f"ChromeDriver not found at: {chromedriver_path}")
-
-        # Initialize Chrome with local ChromeDriver
-        print(f"Starting Chrome with driver from: {chromedriver_path}")
-        service = Service(chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.maximize_window()
-
-        # Navigate to login page
-        print("Navigating to login page...")
-        driver.get("https://app.makeheadway.com/login")
-        time.sleep(4)  # Increased initial wait
-
-        # Wait for and fill email
-        print("Waiting for email input field...")
-        email_input = WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.NAME, "email"))
-        )
-        print("Email field found. Entering email.")
-        email_input.click()
-        email_input.clear()
-        time.sleep(0.5)
-        driver.execute_script(f"arguments[0].value = '{email}'", email_input)
-        driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }))", email_input)
-        driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }))", email_input)
-        time.sleep(0.5)
-
-        # Wait for password input
-        print("Waiting for password input field...")
-        password_input = WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((By.NAME, "password"))
-        )
-        print("Password field found. Entering password.")
-        password_input.click()
-        password_input.clear()
-        time.sleep(0.5)
-        password_input.send_keys(password)
-        time.sleep(0.5)
-
-        # Wait for login button
-        print("Waiting for login button...")
-        login_button = WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
-        )
-        print("Login button found and clickable.")
-
-        # Check if button is enabled
-        is_login_enabled = driver.execute_script("return !arguments[0].disabled", login_button)
-        is_login_mui_disabled = driver.execute_script("return arguments[0].classList.contains('Mui-disabled')", login_button)
-        print(f"Is login button enabled? {is_login_enabled}, Has Mui-disabled class? {is_login_mui_disabled}")
-
-        if not is_login_enabled or is_login_mui_disabled:
-            print("Login button not enabled. Trying JS click...")
-            driver.execute_script("arguments[0].click();", login_button)
-        else:
-            print("Clicking login button...")
-            login_button.click()
-
-        # Wait for login completion
-        print("Waiting for login completion...")
-        WebDriverWait(driver, 25).until(
-            EC.url_changes("https://app.makeheadway.com/login")
+HEADWAY_URL = "https://app.makeheadway.com"
+
+SUMMARY_CONTENT_SELECTOR = ".MuiStack-root.mui-style-mhauuz"
+NEXT_PAGE_BUTTON_SELECTOR = """
+    button.MuiButtonBase-root.MuiButton-root:has(svg path[d^="M16.6141 11"]),
+    button[class*="MuiButton-root"]:has(svg path[d^="M16.6141"])
+"""
+CONTENT_SELECTORS = [SUMMARY_CONTENT_SELECTOR,
+                     ".MuiStack-root",
+                     "div[class*='book-content']"]
+# The same content element and next-page icon, for parsing raw HTML
+SUMMARY_CONTENT_CLASSES = ["MuiStack-root", "mui-style-mhauuz"]
+NEXT_PAGE_ICON = "M16.6141"
+
+_pools = {}
+_http_sessions = {}
+_pools_lock = threading.Lock()
+# Observed page latencies per site, used to size wait timeouts
+_latency = {}
+
+def create_driver():
+    """Start a headless Chrome with the bundled ChromeDriver"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    # Configure Chrome options
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+
+    # Get ChromeDriver path
+    if getattr(sys, 'frozen', False):
+        # If running as compiled executable
+        chromedriver_path = os.path.join(sys._MEIPASS, 'chromedriver.exe')
+    else:
+        # If running from source
+        chromedriver_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+            'drivers',
+            'chromedriver.exe'
         )
-        time.sleep(3)  # Wait for any redirects
 
+    if not os.path.exists(chromedriver_path):
+        raise Exception(f"ChromeDriver not found at: {chromedriver_path}")
+
+    # Initialize Chrome with local ChromeDriver
+    print(f"Starting Chrome with driver from: {chromedriver_path}")
+    service = Service(chromedriver_path)
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.maximize_window()
+    return driver
+
+def login(driver, email, password, base_url=HEADWAY_URL):
+    """Log in through the Headway login form"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from utils.waits import AdaptiveWaiter
+
+    login_url = f"{base_url}/login"
+    waiter = AdaptiveWaiter(driver, latency_tracker(base_url))
+
+    # Navigate to login page
+    print("Navigating to login page...")
+    driver.get(login_url)
+
+    # Wait for and fill email
+    print("Waiting for email input field...")
+    email_input = waiter.until(
+        EC.visibility_of_element_located((By.NAME, "email"))
+    )
+    print("Email field found. Entering email.")
+    email_input.click()
+    email_input.clear()
+    driver.execute_script(f"arguments[0].value = '{email}'", email_input)
+    driver.execute_script("arguments[0].dispatchEvent(new Event('input', { bubbles: true }))", email_input)
+    driver.execute_script("arguments[0].dispatchEvent(new Event('change', { bubbles: true }))", email_input)
+
+    # Wait for password input
+    print("Waiting for password input field...")
+    password_input = waiter.until(
+        EC.visibility_of_element_located((By.NAME, "password"))
+    )
+    print("Password field found. Entering password.")
+    password_input.click()
+    password_input.clear()
+    password_input.send_keys(password)
+
+    # Wait for login button
+    print("Waiting for login button...")
+    login_button = waiter.until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
+    )
+    print("Login button found and clickable.")
+
+    # Check if button is enabled
+    is_login_enabled = driver.execute_script("return !arguments[0].disabled", login_button)
+    is_login_mui_disabled = driver.execute_script("return arguments[0].classList.contains('Mui-disabled')", login_button)
+    print(f"Is login button enabled? {is_login_enabled}, Has Mui-disabled class? {is_login_mui_disabled}")
+
+    if not is_login_enabled or is_login_mui_disabled:
+        print("Login button not enabled. Trying JS click...")
+        driver.execute_script("arguments[0].click();", login_button)
+    else:
+        print("Clicking login button...")
+        login_button.click()
+
+    # Wait for login completion
+    print("Waiting for login completion...")
+    WebDriverWait(driver, 25).until(
+        EC.url_changes(login_url)
+    )
+    waiter.page_ready()  # Wait for any redirects
+
+def base_url_of(book_url):
+    """Return the scheme and host of a book URL, e.g. https://app.makeheadway.com"""
+    parts = urlparse(book_url)
+    if not parts.scheme or not parts.netloc:
+        return HEADWAY_URL
+    return f"{parts.scheme}://{parts.netloc}"
+
+def latency_tracker(base_url=HEADWAY_URL):
+    """Return the shared latency statistics for a site"""
+    with _pools_lock:
+        return _latency.setdefault(base_url, LatencyTracker())
+
+def get_session_pool(base_url=HEADWAY_URL):
+    """Return the shared session pool for a site, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(base_url)
+        if pool is None:
+            pool = SessionPool(create_driver, partial(login, base_url=base_url), base_url)
+            _pools[base_url] = pool
+        return pool
+
+def get_http_session(base_url, email):
+    """Return the shared keep-alive HTTP session for an account on a site"""
+    with _pools_lock:
+        session = _http_sessions.get((base_url, email))
+        if session is None:
+            session = HttpSession(base_url)
+            _http_sessions[(base_url, email)] = session
+        return session
+
+def http_login(session, pool, email, password):
+    """Log the HTTP session in with as little browser work as possible.
+
+    Tries the plain login form first and only then a real browser login,
+    whose cookies are handed over to the HTTP session. Either way the
+    cookies are saved so later runs can skip the login.
+    """
+    print("Logging in over HTTP...")
+    if session.form_login(email, password):
+        pool.write_cookies(email, session.get_cookies())
+        return
+    print("Form login not accepted, logging in with the browser...")
+    with pool.session(email, password) as driver:
+        cookies = driver.get_cookies()
+    session.set_cookies(cookies)
+    pool.write_cookies(email, cookies)
+
+def scrape_headway_book(email, password, book_url, pool=None, output_path=None, on_page=None,
+                        throttle=None, backend="auto", on_fetched=None):
+    """Scrape a book from Headway using provided credentials.
+
+    Logged-in browser sessions are taken from pool (by default a shared
+    pool per site), so only the first scrape has to go through the login.
+    Pages are checkpointed to disk as they are scraped and a rerun resumes
+    where the last one stopped. With output_path every page is appended to
+    that file as it arrives and the path is returned, otherwise the text is
+    returned. on_page(text) is called for every page in order, including
+    the ones restored from the checkpoint, so a reader can start early;
+    on_fetched(text) only for the pages fetched by this call.
+    throttle(url), if given, is called before every page load (see
+    utils.batch_scrape.HostRateLimiter).
+
+    backend "http" fetches the pages with plain keep-alive HTTP requests,
+    "selenium" drives a headless browser and "auto" (the default) tries
+    HTTP first and switches to the browser where the HTTP path cannot get
+    the content, continuing from the checkpoint.
+    """
+    if pool is None:
+        pool = get_session_pool(base_url_of(book_url))
+    checkpoint = ScrapeCheckpoint(book_url)
+    if output_path is not None:
+        # Start the file with the pages an earlier run already saved
+        checkpoint.write_book(output_path)
+    if on_page is not None:
+        for text in checkpoint.iter_texts():
+            on_page(text)
+
+    def page_saved(text):
+        if output_path is not None:
+            with open(output_path, 'a', encoding='utf-8') as f:
+                f.write(text if checkpoint.pages == 1 else "\n\n" + text)
+        if on_page is not None:
+            on_page(text)
+        if on_fetched is not None:
+            on_fetched(text)
+
+    throttle = throttle or (lambda url: None)
+    use_browser = backend == "selenium"
+    if not use_browser:
+        session = get_http_session(base_url_of(book_url), email)
+        try:
+            _scrape_pages_http(session, pool, email, password, book_url, checkpoint,
+                               page_saved, throttle)
+        except HttpFetchError as e:
+            if backend == "http":
+                raise
+            print(f"HTTP fetch failed ({str(e)}), switching to the browser")
+            use_browser = True
+    if use_browser:
+        with pool.session(email, password) as driver:
+            _scrape_pages(driver, pool, email, password, book_url, checkpoint, page_saved,
+                          throttle)
+
+    # Only reached after the last page was confirmed; on any error the
+    # checkpoint stays for the next run
+    if output_path is not None:
+        result = output_path
+    else:
+        result = "\n\n".join(checkpoint.iter_texts())
+    checkpoint.remove()
+    return result
+
+def _scrape_pages_http(session, pool, email, password, book_url, checkpoint, page_saved, throttle):
+    """Fetch the pages over HTTP; raises HttpFetchError when a browser is needed"""
+    if not session.cookies:
+        session.set_cookies(pool.saved_cookies(email) or [])
+    page_count = max(1, checkpoint.last_page)
+    url = checkpoint.last_url if checkpoint.pages and checkpoint.last_url else book_url
+    logged_in = False
+    while url:
+        page_start = time.perf_counter()
+        throttle(url)
+        final_url, status, html = session.get(url)
+        if "/login" in urlparse(final_url).path:
+            if logged_in:
+                raise HttpFetchError("Still sent to the login page after logging in")
+            http_login(session, pool, email, password)
+            logged_in = True
+            continue
+        if status >= 400:
+            raise HttpFetchError(f"HTTP {status} for {final_url}")
+        page_text, next_link = parse_summary_page(html, SUMMARY_CONTENT_CLASSES, NEXT_PAGE_ICON)
+        if not page_text:
+            # The page is rendered by JavaScript, only a browser can read it
+            raise HttpFetchError(f"No content in the HTML of page {page_count}")
+        if checkpoint.append(page_count, final_url, page_text):
+            page_saved(page_text)
+        print(f"Page {page_count} fetched in {time.perf_counter() - page_start:.2f}s")
+        # Without a next button this was the last page; a button whose
+        # target could not be read raised HttpFetchError in the parser
+        if not next_link:
+            break
+        url = urljoin(final_url, next_link)
+        if url.split('#')[0] == final_url.split('#')[0]:
+            raise HttpFetchError(f"The next page button of page {page_count} links to the same page")
+        page_count += 1
+    print(f"Successfully fetched {page_count} pages over HTTP")
+
+def _scrape_pages(driver, pool, email, password, book_url, checkpoint, page_saved, throttle):
+    from selenium.common import TimeoutException
+    from selenium.webdriver.common.by import By
+    from utils.waits import AdaptiveWaiter
+
+    waiter = AdaptiveWaiter(driver, latency_tracker(base_url_of(book_url)))
+    page_count = max(1, checkpoint.last_page)
+    start_url = book_url
+    if checkpoint.pages:
+        print(f"Resuming after page {checkpoint.last_page} ({checkpoint.pages} pages saved)")
+        start_url = checkpoint.last_url or book_url
+
+    try:
         # Navigate to book URL with retry mechanism
         print("Loading book...")
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                driver.get(book_url)
-                time.sleep(5)  # Increased wait time for book loading
+                throttle(start_url)
+                driver.get(start_url)
+
+                # The site sends expired sessions back to the login page
+                if not pool.is_logged_in(driver):
+                    print("Session expired, logging in again...")
+                    pool.relogin(driver, email, password)
+                    continue
                 
                 # Verify we're on the correct page
                 current_url = driver.current_url
@@ -127,97 +311,73 @@ def scrape_headway_book(email, password, book_url):
                     continue
                 
                 # Wait for initial content
-                content = WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, SUMMARY_CONTENT_SELECTOR))
-                )
-                if content.is_displayed() and content.text.strip():
-                    print("Book content loaded successfully")
-                    break
+                waiter.race_selectors([SUMMARY_CONTENT_SELECTOR], timeout=20)
+                print("Book content loaded successfully")
+                break
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed: {str(e)}")
                 if attempt == max_retries - 1:
                     raise Exception("Failed to load book content")
                 time.sleep(2)
 
-        # Scraping loop with improved navigation
+        # Scraping loop with improved navigation. Only a page without an
+        # active next button ends the book; any other failure propagates and
+        # leaves the checkpoint for the next run to resume from
         while True:
             print(f"Processing page {page_count}...")
+            page_start = time.perf_counter()
+            # Race all content selectors instead of waiting on each in turn
             try:
-                # Try multiple selectors for content
-                content_found = False
-                for selector in [SUMMARY_CONTENT_SELECTOR, 
-                               ".MuiStack-root", 
-                               "div[class*='book-content']"]:
-                    try:
-                        content_element = WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                        if content_element.is_displayed():
-                            page_text = content_element.text.strip()
-                            if page_text:
-                                all_summary_text.append(page_text)
-                                print(f"Content found on page {page_count}")
-                                content_found = True
-                                break
-                    except:
-                        continue
-
-                if not content_found:
-                    raise Exception("No content found on current page")
-
-                # Look for next button with improved detection
-                next_buttons = driver.find_elements(By.CSS_SELECTOR, NEXT_PAGE_BUTTON_SELECTOR)
-                next_button = None
-                
-                for btn in next_buttons:
-                    if btn.is_displayed():
-                        is_disabled = driver.execute_script("""
-                            return arguments[0].disabled || 
-                                   arguments[0].classList.contains('Mui-disabled') ||
-                                   !arguments[0].offsetParent;
-                        """, btn)
-                        if not is_disabled:
-                            next_button = btn
-                            break
-
-                if not next_button:
-                    print("No active next button found - reached last page")
-                    break
-
-                # Click next button with verification
-                print("Moving to next page...")
-                current_url = driver.current_url
-                
-                try:
-                    driver.execute_script("arguments[0].click();", next_button)
-                    # Wait for URL or content change
-                    WebDriverWait(driver, 10).until(lambda d: (
-                        d.current_url != current_url or
-                        d.find_element(By.CSS_SELECTOR, SUMMARY_CONTENT_SELECTOR).text != page_text
-                    ))
-                    time.sleep(2)  # Additional wait for content load
-                    page_count += 1
-                except:
-                    print("Page transition failed - reached last page")
-                    break
+                selector, page_text = waiter.race_selectors(CONTENT_SELECTORS)
+            except TimeoutException:
+                raise Exception(f"No content found on page {page_count}")
+            content_time = time.perf_counter() - page_start
+            # Persist right away so a later failure loses nothing
+            if checkpoint.append(page_count, driver.current_url, page_text):
+                print(f"Content found on page {page_count} in {content_time:.2f}s")
+                page_saved(page_text)
+            else:
+                print(f"Page {page_count} was already saved, skipping")
 
-            except Exception as e:
-                print(f"Error on page {page_count}: {str(e)}")
-                if page_count == 1:
-                    raise
+            # Look for next button with improved detection
+            next_buttons = driver.find_elements(By.CSS_SELECTOR, NEXT_PAGE_BUTTON_SELECTOR)
+            next_button = None
+            
+            for btn in next_buttons:
+                if btn.is_displayed():
+                    is_disabled = driver.execute_script("""
+                        return arguments[0].disabled || 
+                               arguments[0].classList.contains('Mui-disabled') ||
+                               !arguments[0].offsetParent;
+                    """, btn)
+                    if not is_disabled:
+                        next_button = btn
+                        break
+
+            if not next_button:
+                print("No active next button found - reached last page")
                 break
 
-        if not all_summary_text:
+            # Click next button with verification
+            print("Moving to next page...")
+            current_url = driver.current_url
+            throttle(current_url)
+            driver.execute_script("arguments[0].click();", next_button)
+            # Wait for URL or content change, woken by DOM mutations
+            try:
+                waiter.wait_for_change(selector, page_text, current_url)
+            except TimeoutException:
+                raise Exception(f"Page {page_count + 1} did not load after clicking next")
+            print(f"Page {page_count} timing: content {content_time:.2f}s, "
+                  f"total {time.perf_counter() - page_start:.2f}s")
+            page_count += 1
+
+        if not checkpoint.pages:
             raise Exception("No content was scraped")
 
         print(f"Successfully scraped {page_count} pages")
-        return "\n\n".join(all_summary_text)  # Simplified join without page break markers
 
     except Exception as e:
         print(f"Error: {str(e)}")
         traceback.print_exc()
         raise
-
-    finally:
-        if driver:
-            driver.quit()
\ No newline at end of file
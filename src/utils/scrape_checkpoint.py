@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+class ScrapeCheckpoint:
+    """Append-only on-disk log of the pages scraped from one book.
+
+    Every page is written as one JSON line and fsynced as soon as it is
+    extracted, so a failed scrape can resume from the last completed page.
+    Only page ids are kept in memory; the texts stay on disk until the book
+    is written out.
+    """
+    def __init__(self, book_url, checkpoint_dir=Path("checkpoints")):
+        self.book_url = book_url
+        self.checkpoint_dir = Path(checkpoint_dir)
+        name = hashlib.sha1(book_url.encode('utf-8')).hexdigest()
+        self.path = self.checkpoint_dir / f"{name}.jsonl"
+        self.page_ids = set()
+        self.last_page = 0
+        self.last_url = None
+        self._load()
+
+    @property
+    def pages(self):
+        return len(self.page_ids)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_end += len(line)
+                self.page_ids.add(record['id'])
+                self.last_page = record['page']
+                self.last_url = record['url']
+        # Cut off a torn last line from a crash mid-write
+        if good_end != self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+
+    @staticmethod
+    def page_id(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def append(self, page, url, text):
+        """Persist a page; returns False if it was already saved"""
+        page_id = self.page_id(text)
+        if page_id in self.page_ids:
+            return False
+        self.checkpoint_dir.mkdir(exist_ok=True)
+        record = {'page': page, 'url': url, 'id': page_id, 'text': text}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.page_ids.add(page_id)
+        self.last_page = page
+        self.last_url = url
+        return True
+
+    def iter_texts(self):
+        """Yield the saved page texts in order without loading them all"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)['text']
+                except ValueError:
+                    break
+
+    def write_book(self, output_path):
+        """Stream the pages into output_path, separated by blank lines"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for i, text in enumerate(self.iter_texts()):
+                if i:
+                    f.write("\n\n")
+                f.write(text)
+        os.replace(temp_path, output_path)
+
+    def remove(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
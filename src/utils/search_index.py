@@ -0,0 +1,271 @@
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from utils.text_processor import _word_re_for
+
+# magic, format version, term count, posting count, term blob length
+_HEADER = struct.Struct('<4sIQQQ')
+_MAGIC = b'SRSI'
+_FORMAT_VERSION = 1
+# Punctuation stripped from both ends of a word before indexing
+_STRIP = '.,;:!?\'"()[]{}<>*_~`/\\|-–—‘’“”«»…'
+_QUERY_RE = re.compile(r'\S+')
+
+
+def normalize(word):
+    """Return the search term of a word: case-folded, without surrounding punctuation"""
+    if not isinstance(word, str):
+        word = word.decode('utf-8', 'replace')
+    return word.strip(_STRIP).casefold()
+
+
+class _TermTable(dict):
+    """Caches the term id of every distinct word; ids are handed out on first sight"""
+    def __init__(self):
+        super().__init__()
+        self.ids = {}
+
+    def __missing__(self, word):
+        term = normalize(word)
+        term_id = self.ids.setdefault(term, len(self.ids)) if term else None
+        self[word] = term_id
+        return term_id
+
+
+class SearchIndex:
+    """Inverted index from normalized terms to the word positions of a book.
+
+    Terms are kept sorted so a prefix is a range found by binary search; the
+    positions of all terms live in one array('I') with per-term offsets.
+    """
+    def __init__(self, terms, offsets, postings):
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, processor, chunk_words=65536):
+        """Index every word of a fully tokenized processor"""
+        table = _TermTable()
+        lists = []
+        starts = processor.get_index()[0]
+        count = len(starts)
+        segments = processor._segments
+        segment_starts = processor._segment_starts
+        position = 0
+        for i, segment in enumerate(segments):
+            word_re = _word_re_for(segment)
+            base = segment_starts[i]
+            first = bisect_left(starts, base)
+            last = bisect_left(starts, segment_starts[i + 1]) if i + 1 < len(segments) else count
+            # One regex pass per chunk of words like utils/timing.build_weights
+            for k in range(first, last, chunk_words):
+                end = k + chunk_words
+                endpos = starts[end] - base if end < last else len(segment)
+                for term_id in map(table.__getitem__, word_re.findall(segment, starts[k] - base, endpos)):
+                    if term_id is not None:
+                        if term_id == len(lists):
+                            lists.append(array('I'))
+                        lists[term_id].append(position)
+                    position += 1
+
+        terms = sorted(table.ids, key=table.ids.__getitem__)
+        order = sorted(range(len(terms)), key=terms.__getitem__)
+        offsets = array('I', [0])
+        postings = array('I')
+        for term_id in order:
+            postings.extend(lists[term_id])
+            offsets.append(len(postings))
+        return cls([terms[term_id] for term_id in order], offsets, postings)
+
+    def _range(self, term, prefix=False):
+        """Return the slice of self.terms matching term"""
+        lo = bisect_left(self.terms, term)
+        if prefix:
+            hi = bisect_left(self.terms, term + '\U0010ffff', lo)
+        else:
+            hi = lo + 1 if lo < len(self.terms) and self.terms[lo] == term else lo
+        return lo, hi
+
+    def positions(self, term, prefix=False):
+        """Return the sorted word positions of a term or of all terms starting with it"""
+        lo, hi = self._range(term, prefix)
+        if hi - lo == 1:
+            return self.postings[self.offsets[lo]:self.offsets[hi]]
+        return array('I', sorted(self.postings[self.offsets[lo]:self.offsets[hi]]))
+
+    def find(self, query):
+        """Return the sorted positions where query starts.
+
+        Several words are searched as a phrase. A trailing * makes a word
+        match every term starting with it, e.g. "speed read*".
+        """
+        parts = []
+        for word in _QUERY_RE.findall(query):
+            prefix = word.endswith('*')
+            term = normalize(word.rstrip('*'))
+            if term:
+                parts.append((term, prefix))
+        if not parts:
+            return array('I')
+        lists = [self.positions(term, prefix) for term, prefix in parts]
+        if len(lists) == 1:
+            return lists[0]
+        # Start from the rarest word and narrow its candidates down with the
+        # others, rarest first; long lists are probed by binary search
+        # instead of being turned into sets
+        order = sorted(range(len(lists)), key=lambda k: len(lists[k]))
+        anchor = order[0]
+        starts = [p - anchor for p in lists[anchor] if p >= anchor]
+        for k in order[1:]:
+            positions = lists[k]
+            if not starts:
+                break
+            if len(positions) > 16 * len(starts):
+                kept = []
+                for start in starts:
+                    i = bisect_left(positions, start + k)
+                    if i < len(positions) and positions[i] == start + k:
+                        kept.append(start)
+                starts = kept
+            else:
+                shifted = {p - k for p in positions}
+                starts = [start for start in starts if start in shifted]
+        return array('I', starts)
+
+    def save(self, path):
+        """Write the index atomically"""
+        if sys.byteorder != 'little':
+            return
+        path = Path(path)
+        blob = '\n'.join(self.terms).encode('utf-8')
+        temp_path = path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(self.terms), len(self.postings), len(blob)))
+                f.write(memoryview(self.offsets).cast('B'))
+                f.write(memoryview(self.postings).cast('B'))
+                f.write(blob)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving search index: {str(e)}")
+
+    @classmethod
+    def load(cls, path, word_count):
+        """Return the index stored at path, or None if missing or not for word_count words"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, version, term_count, posting_count, blob_length = _HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        offsets = array('I')
+        size = _HEADER.size + ((term_count + 1) + posting_count) * offsets.itemsize + blob_length
+        if magic != _MAGIC or version != _FORMAT_VERSION or len(data) != size or sys.byteorder != 'little':
+            return None
+        # Every word is indexed at most once
+        if posting_count > word_count:
+            return None
+        postings = array('I')
+        position = _HEADER.size
+        offsets.frombytes(data[position:position + (term_count + 1) * offsets.itemsize])
+        position += len(offsets) * offsets.itemsize
+        postings.frombytes(data[position:position + posting_count * postings.itemsize])
+        terms = data[position + len(postings) * postings.itemsize:].decode('utf-8').split('\n') if term_count else []
+        if len(terms) != term_count:
+            return None
+        os.utime(path)
+        return cls(terms, offsets, postings)
+
+
+class BookSearch:
+    """Search index of whatever text a TextProcessor holds.
+
+    prepare() builds (or loads from index_dir) the index on a background
+    thread once tokenizing is done; find() returns None until it is ready.
+    Indexes of cached books are kept in index_dir, the max_files most
+    recently used ones.
+    """
+    def __init__(self, processor, index_dir=Path("saves") / "search", max_files=32):
+        self.processor = processor
+        self.index_dir = Path(index_dir)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._index = None
+        # The word start array the index was built from; TextProcessor
+        # replaces it whenever the text changes
+        self._source = None
+        self._building = None
+
+    def _current(self):
+        with self._lock:
+            if self._index is not None and self._source is self.processor.get_index()[0]:
+                return self._index
+        return None
+
+    def is_current(self):
+        """Return True if the index matches the current text"""
+        return self._current() is not None
+
+    def prepare(self):
+        """Start building the index of the current text unless it is up to date"""
+        if self._current() is not None:
+            return
+        with self._lock:
+            if self._building is not None and self._building.is_alive():
+                return
+            self._building = threading.Thread(target=self._build, daemon=True)
+            self._building.start()
+
+    def _build(self):
+        processor = self.processor
+        processor.wait_until_complete()
+        starts = processor.get_index()[0]
+        key = processor._cache_key
+        path = self.index_dir / f"{key}.sidx" if key else None
+        index = SearchIndex.load(path, len(starts)) if path else None
+        if index is None:
+            index = SearchIndex.build(processor)
+            if path and starts is processor.get_index()[0]:
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                index.save(path)
+                self._prune()
+        with self._lock:
+            self._index = index
+            self._source = starts
+        if starts is not processor.get_index()[0]:
+            # The text changed while indexing; the next prepare() rebuilds
+            print("Text changed while indexing, search index is outdated")
+
+    def _prune(self):
+        files = sorted(self.index_dir.glob("*.sidx"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in files[self.max_files:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def find(self, query):
+        """Return the sorted word positions of query, or None while indexing"""
+        index = self._current()
+        if index is None:
+            self.prepare()
+            return None
+        return index.find(query)
+
+    @staticmethod
+    def next_hit(hits, position, backwards=False):
+        """Return the first hit after (or before) position, wrapping around"""
+        if not hits:
+            return None
+        if backwards:
+            i = bisect_left(hits, position) - 1
+            return hits[i] if i >= 0 else hits[-1]
+        i = bisect_right(hits, position)
+        return hits[i] if i < len(hits) else hits[0]
@@ -0,0 +1,167 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SessionPool:
+    """Keeps logged-in browser sessions warm between scrapes.
+
+    Idle drivers are kept per account and reused, and their cookies are
+    persisted to disk so a fresh driver (e.g. after a restart) can skip the
+    login form. Sessions are health-checked on checkout and recycled once
+    they are older than max_age seconds or the site sends them back to login.
+    """
+    def __init__(self, create_driver, login, base_url, max_idle=2, max_age=3600,
+                 cookie_dir=Path("sessions")):
+        self.create_driver = create_driver
+        self.login = login
+        self.base_url = base_url.rstrip('/')
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.cookie_dir = Path(cookie_dir)
+        self._idle = {}
+        self._created = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    @contextmanager
+    def session(self, email, password):
+        """Check out a logged-in driver; it goes back to the pool unless it failed"""
+        driver = self.acquire(email, password)
+        try:
+            yield driver
+        except Exception:
+            self.discard(driver)
+            raise
+        else:
+            self.release(email, driver)
+
+    def acquire(self, email, password):
+        while True:
+            with self._lock:
+                idle = self._idle.get(email)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                break
+            if self.is_healthy(driver):
+                print("Reusing warm browser session")
+                return driver
+            self.discard(driver)
+
+        driver = self.create_driver()
+        self._created[id(driver)] = time.monotonic()
+        try:
+            if not self._restore_cookies(driver, email):
+                self.login(driver, email, password)
+                self.save_cookies(driver, email)
+        except Exception:
+            self.discard(driver)
+            raise
+        return driver
+
+    def release(self, email, driver):
+        with self._lock:
+            idle = self._idle.setdefault(email, [])
+            if len(idle) < self.max_idle:
+                idle.append(driver)
+                driver = None
+        if driver is not None:
+            self.discard(driver)
+
+    def discard(self, driver):
+        self._created.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def is_healthy(self, driver):
+        """Return True if the driver still responds and is not too old"""
+        from selenium.common import WebDriverException
+        created = self._created.get(id(driver), 0)
+        if time.monotonic() - created > self.max_age:
+            return False
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def is_logged_in(self, driver):
+        return "/login" not in driver.current_url
+
+    def relogin(self, driver, email, password):
+        """Log in again after the site expired the session"""
+        self.login(driver, email, password)
+        self.save_cookies(driver, email)
+
+    def _cookie_path(self, email):
+        name = hashlib.sha1(email.strip().lower().encode('utf-8')).hexdigest()
+        return self.cookie_dir / f"{name}.json"
+
+    def save_cookies(self, driver, email):
+        from selenium.common import WebDriverException
+        try:
+            self.write_cookies(email, driver.get_cookies())
+        except WebDriverException as e:
+            print(f"Could not save session cookies: {str(e)}")
+
+    def write_cookies(self, email, cookies):
+        """Persist cookies (Selenium's dict format) for the next session of email"""
+        try:
+            self.cookie_dir.mkdir(mode=0o700, exist_ok=True)
+            path = self._cookie_path(email)
+            temp_path = path.with_suffix('.tmp')
+            # Login cookies are credentials; only the owner may read them
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.chmod(temp_path, 0o600)
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not save session cookies: {str(e)}")
+
+    def saved_cookies(self, email):
+        """Return the cookies saved for email, or None"""
+        path = self._cookie_path(email)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read session cookies: {str(e)}")
+            return None
+
+    def _restore_cookies(self, driver, email):
+        """Load saved cookies into a new driver; return True if that logged it in"""
+        from selenium.common import WebDriverException
+        cookies = self.saved_cookies(email)
+        if not cookies:
+            return False
+        try:
+            # Cookies can only be set for the domain that is currently open
+            driver.get(self.base_url + "/login")
+            for cookie in cookies:
+                cookie.pop('sameSite', None)
+                driver.add_cookie(cookie)
+            driver.get(self.base_url)
+        except WebDriverException as e:
+            print(f"Could not restore session cookies: {str(e)}")
+            return False
+        if self.is_logged_in(driver):
+            print("Restored session from saved cookies")
+            return True
+        return False
+
+    def close_all(self):
+        with self._lock:
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self.discard(driver)
@@ -1,14 +1,545 @@
+import mmap
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from pathlib import Path
+
+# Splits text into alternating word / whitespace runs
+_SPLIT_RE = re.compile(r'(\s+)')
+_WORD_RE = re.compile(r'\S+')
+_SPACE_RE = re.compile(r'\s+')
+# Same patterns for memory-mapped files, which are tokenized as UTF-8 bytes.
+# rb'\s' only knows ASCII whitespace, so the other characters str's \s
+# matches are spelled out in UTF-8 and both kinds of source split alike
+_BYTES_WIDE_SPACE = rb'\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80'
+_BYTES_SPACE = rb'(?:[\t-\r\x1c- ]|' + _BYTES_WIDE_SPACE + rb')'
+# Whitespace other than a newline
+_BYTES_BLANK = rb'(?:[\t\x0b-\r\x1c- ]|' + _BYTES_WIDE_SPACE + rb')'
+_BYTES_NON_SPACE = (rb'(?:[^\t-\r\x1c- \xc2\xe1\xe2\xe3]|\xc2(?![\x85\xa0])|\xe1(?!\x9a\x80)'
+                    rb'|\xe2(?!\x80[\x80-\x8a\xa8\xa9\xaf]|\x81\x9f)|\xe3(?!\x80\x80))')
+_BYTES_SPLIT_RE = re.compile(rb'(' + _BYTES_SPACE + rb'+)')
+# The lookbehinds keep a match from starting inside a wide space
+_BYTES_WORD_RE = re.compile(rb'(?<![\xc2\xe1\xe2\xe3])(?<!\xe1\x9a|\xe2\x80|\xe2\x81|\xe3\x80)'
+                            + _BYTES_NON_SPACE + rb'+')
+_BYTES_SPACE_RE = re.compile(_BYTES_SPACE + rb'+')
+# Cheaper patterns for the usual bytes that hold no whitespace beyond ASCII
+_ASCII_SPLIT_RE = re.compile(rb'([\t-\r\x1c- ]+)')
+_ASCII_WORD_RE = re.compile(rb'[^\t-\r\x1c- ]+')
+_WIDE_SPACES = tuple(c.encode('utf-8') for c in
+                     '\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007'
+                     '\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000')
+# A sentence ends at . ! or ? (optionally closed by quotes or brackets) before whitespace
+_SENTENCE_END_RE = re.compile(r'[.!?][\'"\u201d\u2019)\]]*(?=\s|$)')
+_BYTES_SENTENCE_END_RE = re.compile(rb'[.!?](?:[\'")\]]|\xe2\x80\x9d|\xe2\x80\x99)*(?=' + _BYTES_SPACE + rb'|$)')
+# A paragraph starts after a blank line
+_PARAGRAPH_RE = re.compile(r'\n[^\S\n]*\n\s*')
+_BYTES_PARAGRAPH_RE = re.compile(rb'\n' + _BYTES_BLANK + rb'*\n' + _BYTES_SPACE + rb'*')
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+# Words that usually open a new phrase; chunks prefer to break before them
+_PHRASE_STARTS = frozenset("""
+    a an the and but or nor so yet for of in on at to by from with without into onto
+    over under about after before since until while because although if when where
+    which who whom whose that than as like through during against between among
+""".split())
+_PHRASE_END = ',;:.!?'
+_CLOSING = '\'"\u201d\u2019)]'
+
+# Bump whenever tokenization changes so cached indexes are rebuilt
+TOKENIZER_VERSION = 2
+
+
+def _has_wide_space(data):
+    """Return True if UTF-8 data holds whitespace outside ASCII"""
+    return any(data.find(space) != -1 for space in _WIDE_SPACES)
+
+
+def _word_re_for(segment):
+    """The pattern that finds the words of a str or UTF-8 segment"""
+    if isinstance(segment, str):
+        return _WORD_RE
+    return _BYTES_WORD_RE if _has_wide_space(segment) else _ASCII_WORD_RE
+
+
+def map_file(path):
+    """Memory-map a file read-only; empty files map to an empty bytes object"""
+    with open(path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b''
+
+
+class WordList:
+    """Read-only sequence view that materializes words on access"""
+    def __init__(self, processor):
+        self._processor = processor
+
+    def __len__(self):
+        return self._processor.word_count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._processor.word(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._processor.word(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._processor.word(i)
+
+
 class TextProcessor:
+    # Characters (or bytes for files) tokenized per step when streaming
+    BLOCK_SIZE = 64 * 1024
+    # Array typecode for word offsets (4 bytes each)
+    OFFSET_TYPE = 'I'
+
     def __init__(self):
         self.text = ""
-        self.words = []
+        self.words = WordList(self)
+        self.complete = True
+        # The str or memory-mapped file the words point into
+        self.buffer = ""
+        self.source_path = None
+        # Optional BookCache for pre-tokenized file indexes
+        self.cache = None
+        # Optional utils.lexicon.Lexicon; slows the pace down on rare words
+        self.lexicon = None
+        # Words are stored only as start offsets into the text segments,
+        # a word runs from its start to the next whitespace
+        self._segments = []
+        self._segment_starts = array('q')
+        self._starts = array(self.OFFSET_TYPE)
+        # Word indexes at which sentences and paragraphs start
+        self._sentence_starts = array(self.OFFSET_TYPE, [0])
+        self._paragraph_starts = array(self.OFFSET_TYPE, [0])
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._thread = None
+        # PaceSchedule built on first use once tokenizing is done; the lock
+        # keeps readers that ask at the same time from building it twice
+        self._schedule = None
+        self._schedule_lock = threading.Lock()
+        self._cache_key = None
+        # Multi-word chunks, extended lazily ahead of the reader. measure(text)
+        # returns a display width and chunks never get wider than max_width.
+        self._chunk_measure = len
+        self._chunk_max_width = 24
+        self._chunk_max_words = 3
+        self._clear_chunks()
+
+    def _reset(self, buffer, source_path=None):
+        self.buffer = buffer
+        self.source_path = source_path
+        self._segments = []
+        self._segment_starts = array('q')
+        self._starts = array(self.OFFSET_TYPE)
+        self._sentence_starts = array(self.OFFSET_TYPE, [0])
+        self._paragraph_starts = array(self.OFFSET_TYPE, [0])
+        self._schedule = None
+        self._cache_key = None
+        self._clear_chunks()
+        if buffer is not None:
+            self._add_segment(buffer, 0)
 
     def set_text(self, text):
         """Set the text to be processed"""
-        self.text = text.strip()
-        # Split text into words, removing empty strings
-        self.words = [word for word in self.text.split() if word]
+        generation = self._cancel_stream()
+        self._reset(text)
+        self.text = text
+        # Tokenize block by block to keep the temporary split lists small
+        for base, block in self._buffer_blocks(text):
+            self._append(generation, *self._tokenize(block, base))
+        self._mark_complete(generation)
+
+    def stream_text(self, source):
+        """Tokenize a string or a file path lazily.
+
+        Files are memory-mapped rather than read. The first block is split
+        right away so reading can start immediately, the rest is tokenized on
+        a background thread. Use wait_for_words() or is_complete() to follow
+        its progress.
+        """
+        generation = self._cancel_stream()
+        start = 0
+        if isinstance(source, Path):
+            buffer = map_file(source)
+            self._reset(buffer, source)
+            self.text = ""
+            if buffer[:3] == _UTF8_BOM:
+                start = 3
+        else:
+            self._reset(source)
+            self.text = source
+        self.complete = False
+
+        blocks = self._buffer_blocks(self.buffer, start)
+        first = next(blocks, None)
+        if first is None:
+            self._mark_complete(generation)
+            return
+        self._append(generation, *self._tokenize(first[1], first[0]))
+
+        self._thread = threading.Thread(target=self._stream_worker,
+                                        args=(generation, blocks))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stream_pages(self, pages):
+        """Consume text pieces (e.g. scraped pages) from a queue.Queue.
+
+        Every piece becomes readable as soon as it arrives; pieces are
+        joined by a blank line, like in the saved book file. Putting None on
+        the queue marks the end of the text.
+        """
+        generation = self._cancel_stream()
+        self._reset(None)
+        self.buffer = self.text = ""
+        self.complete = False
+        self._thread = threading.Thread(target=self._pages_worker,
+                                        args=(generation, pages))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _pages_worker(self, generation, pages):
+        length = 0
+        try:
+            while generation == self._generation:
+                piece = pages.get()
+                if piece is None:
+                    break
+                if length:
+                    piece = "\n\n" + piece
+                with self._cond:
+                    if generation != self._generation:
+                        return
+                    self._add_segment(piece, length)
+                self._append(generation, *self._tokenize(piece, length))
+                length += len(piece)
+        finally:
+            self._mark_complete(generation)
+
+    def _stream_worker(self, generation, blocks):
+        cache_key = None
+        try:
+            if self.cache is not None and self.source_path is not None:
+                cache_key = self.cache.key_for(self.buffer)
+                self._cache_key = cache_key
+                cached = self.cache.load(cache_key)
+                if cached is not None:
+                    self._install(generation, *cached)
+                    return
+            for base, block in blocks:
+                if generation != self._generation:
+                    return
+                self._append(generation, *self._tokenize(block, base))
+            if cache_key is not None and generation == self._generation:
+                self._trim_boundaries()
+                self.cache.store(cache_key, *self.get_index())
+        finally:
+            self._mark_complete(generation)
+
+    def _tokenize(self, block, base):
+        """Return the word start offsets of block (shifted by base) and the
+        block-local word indexes where sentences and paragraphs start"""
+        if isinstance(block, str):
+            split_re, sentence_re, paragraph_re = _SPLIT_RE, _SENTENCE_END_RE, _PARAGRAPH_RE
+        else:
+            split_re = _BYTES_SPLIT_RE if _has_wide_space(block) else _ASCII_SPLIT_RE
+            sentence_re, paragraph_re = _BYTES_SENTENCE_END_RE, _BYTES_PARAGRAPH_RE
+        parts = split_re.split(block)
+        # parts alternates word, whitespace, word, ...; the running length
+        # sum gives every boundary without touching the words one by one
+        bounds = array(self.OFFSET_TYPE, accumulate(map(len, parts), initial=base))
+        block_starts = bounds[0:-1:2]
+        first, last = 0, len(block_starts)
+        # Only the first and last part can be empty (leading/trailing space)
+        if not parts[0]:
+            first = 1
+        if last > first and not parts[-1]:
+            last -= 1
+        block_starts = block_starts[first:last]
+
+        # Boundaries are rare compared to words, so they are found with a
+        # regex scan and mapped back to word indexes by binary search
+        paragraphs = [bisect_left(block_starts, base + m.end())
+                      for m in paragraph_re.finditer(block)]
+        sentences = [bisect_right(block_starts, base + m.start())
+                     for m in sentence_re.finditer(block)]
+        if paragraphs:
+            sentences = sorted(set(sentences).union(paragraphs))
+        return block_starts, sentences, paragraphs
+
+    def _append(self, generation, block_starts, sentences, paragraphs):
+        """Add a tokenized block unless a newer source replaced this one"""
+        with self._cond:
+            if generation != self._generation:
+                return
+            offset = len(self._starts)
+            self._starts.extend(block_starts)
+            for starts, local in ((self._sentence_starts, sentences),
+                                  (self._paragraph_starts, paragraphs)):
+                for index in local:
+                    index += offset
+                    if index > starts[-1]:
+                        starts.append(index)
+            self._cond.notify_all()
+
+    def _install(self, generation, starts, sentences, paragraphs):
+        """Replace the index with a complete one, e.g. loaded from the cache"""
+        with self._cond:
+            if generation != self._generation:
+                return
+            self._starts = starts
+            self._sentence_starts = sentences
+            self._paragraph_starts = paragraphs
+            self._cond.notify_all()
+
+    def _trim_boundaries(self):
+        """Drop boundaries pointing past the last word (text ending in a period)"""
+        with self._cond:
+            count = len(self._starts)
+            for starts in (self._sentence_starts, self._paragraph_starts):
+                while len(starts) > 1 and starts[-1] >= count:
+                    starts.pop()
+
+    def _add_segment(self, segment, base):
+        with self._cond:
+            self._segments.append(segment)
+            self._segment_starts.append(base)
+
+    def _mark_complete(self, generation):
+        with self._cond:
+            if generation == self._generation:
+                self._trim_boundaries()
+                self.complete = True
+            self._cond.notify_all()
+
+    def _cancel_stream(self):
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+        return self._generation
+
+    def _buffer_blocks(self, buffer, start=0):
+        """Yield (offset, block) pairs of buffer that never cut through a word"""
+        space_re = _SPACE_RE if isinstance(buffer, str) else _BYTES_SPACE_RE
+        length = len(buffer)
+        while start < length:
+            end = start + self.BLOCK_SIZE
+            if end < length:
+                # Extend past the next whitespace run so the last word and
+                # a blank line between paragraphs are never cut in two
+                match = space_re.search(buffer, end)
+                end = match.end() if match else length
+            else:
+                end = length
+            yield start, buffer[start:end]
+            start = end
+
+    def apply_edit(self, offset, removed, inserted):
+        """Apply an edit to the text and re-tokenize only the words around it.
+
+        offset and removed are in characters. Returns (first_word,
+        old_word_count, new_word_count) describing the words that were
+        replaced, or None when the source is not a fully tokenized text and
+        the caller has to tokenize it again from scratch.
+        """
+        with self._cond:
+            old = self.buffer
+            if not isinstance(old, str) or not self.complete or len(self._segments) != 1:
+                return None
+            if offset < 0 or removed < 0 or offset + removed > len(old):
+                return None
+            new = old[:offset] + inserted + old[offset + removed:]
+            delta = len(inserted) - removed
+            starts = self._starts
+
+            # Re-tokenize from the last word starting before the edit up to
+            # the first word that starts after it; words can merge or split
+            # at either edge, everything else only shifts
+            first = bisect_left(starts, offset) - 1
+            if first < 0:
+                first, region_start = 0, 0
+            else:
+                region_start = starts[first]
+            last = bisect_right(starts, offset + removed)
+            region_end = (starts[last] if last < len(starts) else len(old)) + delta
+            region_starts, sentences, paragraphs = self._tokenize(new[region_start:region_end], region_start)
+
+            added = len(region_starts)
+            word_delta = added - (last - first)
+            tail = starts[last:]
+            if delta:
+                tail = array(self.OFFSET_TYPE, map(delta.__add__, tail))
+            self._starts = starts[:first] + region_starts + tail
+
+            # Whether word first starts a sentence depends only on the text
+            # before it, so boundaries up to first are kept as they are
+            for name, local in (('_sentence_starts', sentences), ('_paragraph_starts', paragraphs)):
+                bounds = getattr(self, name)
+                keep = bisect_right(bounds, first)
+                replaced = bisect_right(bounds, last)
+                head = bounds[:keep]
+                for index in local:
+                    if index > 0 and first + index > head[-1]:
+                        head.append(first + index)
+                tail = bounds[replaced:]
+                if word_delta:
+                    tail = array(self.OFFSET_TYPE, map(word_delta.__add__, tail))
+                setattr(self, name, head + tail)
+            self._trim_boundaries()
+
+            self.buffer = self.text = new
+            self._segments[0] = new
+            self._schedule = None
+            self._clear_chunks()
+            self._cond.notify_all()
+            return first, last - first, added
+
+    def set_chunking(self, measure, max_width, max_words=3):
+        """Configure chunk mode; measure(text) gives the display width of text"""
+        with self._cond:
+            self._chunk_measure = measure
+            self._chunk_max_width = max_width
+            self._chunk_max_words = max_words
+            self._clear_chunks()
+
+    def _clear_chunks(self):
+        self._chunk_starts = array(self.OFFSET_TYPE, [0])
+        self._chunk_scan = 0
+        self._chunk_size = 0
+        self._chunk_width = 0
+        self._chunk_after_punct = False
+
+    def _extend_chunks(self, stop):
+        """Assign words up to stop to chunks, continuing the open chunk"""
+        measure = self._chunk_measure
+        max_width = self._chunk_max_width
+        max_words = self._chunk_max_words
+        space = measure(' ')
+        chunk_starts = self._chunk_starts
+        paragraphs = self._paragraph_starts
+        p = bisect_left(paragraphs, self._chunk_scan)
+        next_paragraph = paragraphs[p] if p < len(paragraphs) else stop
+        size, width, after_punct = self._chunk_size, self._chunk_width, self._chunk_after_punct
+        for index in range(self._chunk_scan, stop):
+            word = self.word(index)
+            word_width = measure(word)
+            if index == next_paragraph:
+                p += 1
+                next_paragraph = paragraphs[p] if p < len(paragraphs) else stop
+                brk = size > 0
+            else:
+                brk = size > 0 and (
+                    size >= max_words or after_punct
+                    or width + space + word_width > max_width
+                    or (size >= 2 and word.lower() in _PHRASE_STARTS))
+            if brk:
+                chunk_starts.append(index)
+                size, width = 1, word_width
+            elif size:
+                size, width = size + 1, width + space + word_width
+            else:
+                size, width = 1, word_width
+            after_punct = word.rstrip(_CLOSING)[-1:] in _PHRASE_END
+        self._chunk_scan = stop
+        self._chunk_size, self._chunk_width, self._chunk_after_punct = size, width, after_punct
+
+    def chunk_end(self, index, batch=1024):
+        """Return the index after the last word of the chunk containing word index.
+
+        Chunks are computed once, a batch of words ahead of the reader.
+        """
+        with self._cond:
+            count = len(self._starts)
+            while (bisect_right(self._chunk_starts, index) == len(self._chunk_starts)
+                   and self._chunk_scan < count):
+                self._extend_chunks(min(count, self._chunk_scan + batch))
+            i = bisect_right(self._chunk_starts, index)
+            return self._chunk_starts[i] if i < len(self._chunk_starts) else count
+
+    def is_complete(self):
+        """Return True once the whole source has been tokenized"""
+        return self.complete
+
+    def wait_for_words(self, count, timeout=None):
+        """Block until at least count words exist or tokenization finished"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: len(self._starts) >= count or self.complete, timeout)
+
+    def wait_until_complete(self, timeout=None):
+        """Block until the whole source has been tokenized"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.complete, timeout)
+
+    def cached_schedule(self):
+        """Return the PaceSchedule if it is already built, without building it"""
+        with self._cond:
+            return self._schedule if self.complete else None
+
+    def get_schedule(self):
+        """Return the PaceSchedule of the text, or None while it is still being tokenized.
+
+        It is built once per text and kept in the book cache with the index.
+        """
+        from utils.timing import PaceSchedule, build_weights
+
+        with self._schedule_lock:
+            with self._cond:
+                if not self.complete:
+                    return None
+                if self._schedule is not None:
+                    return self._schedule
+                generation = self._generation
+                cache_key = self._cache_key
+            weights = None
+            variant = self.lexicon.tag() if self.lexicon is not None else ""
+            if cache_key is not None:
+                weights = self.cache.load_pace(cache_key, self.word_count(), variant)
+            if weights is None:
+                weights = build_weights(self, lexicon=self.lexicon)
+                if cache_key is not None:
+                    self.cache.store_pace(cache_key, weights, variant)
+            schedule = PaceSchedule(weights)
+            with self._cond:
+                if generation == self._generation and len(weights) == len(self._starts):
+                    self._schedule = schedule
+            return schedule
+
+    def word_count(self):
+        return len(self._starts)
+
+    def word(self, index):
+        """Materialize word number index"""
+        start = self._starts[index]
+        segments = self._segments
+        i = 0
+        if len(segments) > 1:
+            i = bisect_right(self._segment_starts, start) - 1
+        segment = segments[i]
+        if isinstance(segment, str):
+            return _WORD_RE.match(segment, start - self._segment_starts[i]).group()
+        word = _BYTES_WORD_RE.match(segment, start - self._segment_starts[i]).group()
+        return word.decode('utf-8', 'replace')
+
+    def char_offset(self, index):
+        """Return the offset of word number index in the source.
+
+        This is a character offset for text and a byte offset for files.
+        """
+        return self._starts[index]
 
     def get_words(self):
-        """Return the list of processed words"""
+        """Return the processed words as a lazily materialized sequence"""
         return self.words
+
+    def get_index(self):
+        """Return the word start, sentence start and paragraph start arrays"""
+        return self._starts, self._sentence_starts, self._paragraph_starts
@@ -0,0 +1,137 @@
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from utils.text_processor import _word_re_for
+
+# Bump whenever the weights change so cached schedules are rebuilt
+TIMING_VERSION = 1
+
+# Extra time, in multiples of an average word, after trailing punctuation
+CLAUSE_PAUSE = 0.5      # , ; :
+SENTENCE_PAUSE = 1.0    # . ! ?
+DASH_PAUSE = 0.3        # - and dashes
+PARAGRAPH_PAUSE = 1.0   # last word of a paragraph
+# Extra time per letter right of the recognition point beyond the first few
+LETTER_STEP = 0.12
+EASY_LETTERS = 4
+SHORT_WORD = 0.9
+MAX_WEIGHT = 3.5
+
+_CLOSING = '\'"”’)]'
+
+
+def orp_index(word):
+    """Return the index of the optimal recognition point letter of a word"""
+    length = len(word)
+    if length <= 1:
+        return 0
+    if length <= 5:
+        return 1
+    if length <= 9:
+        return 2
+    if length <= 13:
+        return 3
+    return 4
+
+
+def word_weight(word):
+    """Relative display time of one word; 1.0 is a plain average word"""
+    core = word.rstrip(_CLOSING)
+    last = core[-1:]
+    letters = len(core.rstrip('.,;:!?-–—'))
+    # The eye lands on the recognition point; letters right of it cost time
+    right = letters - orp_index(core) - 1
+    weight = SHORT_WORD if letters <= 2 else 1.0
+    weight += LETTER_STEP * max(0, right - EASY_LETTERS)
+    if last in '.!?':
+        weight += SENTENCE_PAUSE
+    elif last in ',;:':
+        weight += CLAUSE_PAUSE
+    elif last in '-–—':
+        weight += DASH_PAUSE
+    return min(weight, MAX_WEIGHT)
+
+
+class _WeightTable(dict):
+    """word -> weight, computed once per distinct word"""
+    def __missing__(self, word):
+        if isinstance(word, bytes):
+            weight = word_weight(word.decode('utf-8', 'replace'))
+        else:
+            weight = word_weight(word)
+        self[word] = weight
+        return weight
+
+
+class PaceSchedule:
+    """Per-word display durations for a whole book, averaging one word per slot.
+
+    Built from weights, where weights[i] is the relative display time of
+    word i; scale brings their mean to 1.0, which keeps the book as long as
+    with a fixed pace at any WPM. Only the running sum of the weights is
+    kept (a float64 per word), so offset() is a single lookup however often
+    deadlines are computed.
+    """
+    def __init__(self, weights):
+        self._offsets = array('d', accumulate(weights, initial=0.0))
+        total = self._offsets[-1]
+        self.scale = len(weights) / total if total > 0 else 1.0
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def weight(self, index):
+        return (self._offsets[index + 1] - self._offsets[index]) * self.scale
+
+    def offset(self, index):
+        """Time from the start of the book to word index, in average words"""
+        count = len(self._offsets) - 1
+        if index >= count:
+            return self._offsets[-1] * self.scale + index - count
+        return self._offsets[index] * self.scale
+
+
+def _word_chunks(processor, chunk_words):
+    """Yield lists of up to chunk_words consecutive words, from one regex pass each"""
+    starts = processor.get_index()[0]
+    count = len(starts)
+    segments = processor._segments
+    segment_starts = processor._segment_starts
+    for i, segment in enumerate(segments):
+        word_re = _word_re_for(segment)
+        base = segment_starts[i]
+        first = bisect_left(starts, base)
+        last = bisect_left(starts, segment_starts[i + 1]) if i + 1 < len(segments) else count
+        for k in range(first, last, chunk_words):
+            end = k + chunk_words
+            endpos = starts[end] - base if end < last else len(segment)
+            yield word_re.findall(segment, starts[k] - base, endpos)
+
+
+def build_weights(processor, chunk_words=65536, lexicon=None):
+    """Compute the weight of every word of a fully tokenized processor.
+
+    With an available utils.lexicon.Lexicon rare words get more time; the
+    distinct words of the book are collected first and looked up in one
+    batch, so the lexicon is never consulted per word.
+    """
+    table = _WeightTable()
+    weights = array('f')
+    count = processor.word_count()
+    paragraphs = processor.get_index()[2]
+    if lexicon is not None and lexicon.available():
+        distinct = set()
+        for words in _word_chunks(processor, chunk_words):
+            distinct.update(words)
+        for word, factor in lexicon.multipliers(distinct).items():
+            table[word] = min(MAX_WEIGHT, table[word] * factor)
+    # Weights are computed per distinct word and looked up for the rest
+    for words in _word_chunks(processor, chunk_words):
+        weights.extend(map(table.__getitem__, words))
+    if len(weights) != count:
+        weights = array('f', map(table.__getitem__, processor.get_words()))
+
+    for start in paragraphs[1:]:
+        weights[start - 1] += PARAGRAPH_PAUSE
+    return weights
@@ -0,0 +1,105 @@
+import math
+import threading
+import time
+from collections import deque
+
+# Returns [index, text] for the first candidate selector whose element is
+# visible and has text, checking all candidates in one round trip
+_RACE_SELECTORS_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var el = document.querySelector(selectors[i]);
+    if (el && el.offsetParent !== null) {
+        var text = (el.innerText || '').trim();
+        if (text) { return [i, text]; }
+    }
+}
+return null;
+"""
+
+# Resolves once the URL or the text under the selector changes, woken by DOM
+# mutations instead of polling
+_WAIT_FOR_CHANGE_JS = """
+var selector = arguments[0], oldText = arguments[1], oldUrl = arguments[2];
+var done = arguments[arguments.length - 1];
+function changed() {
+    if (location.href !== oldUrl) { return true; }
+    var el = document.querySelector(selector);
+    var text = el ? (el.innerText || '').trim() : '';
+    return text !== '' && text !== oldText;
+}
+if (changed()) { done(true); return; }
+var observer = new MutationObserver(function() {
+    if (changed()) { observer.disconnect(); done(true); }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+"""
+
+
+class LatencyTracker:
+    """Keeps recent page latencies and derives timeouts from them"""
+    def __init__(self, initial_timeout=15.0, min_timeout=3.0, max_timeout=30.0, samples=32):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._samples = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def timeout(self):
+        """Return a timeout well above the slowest recent latency"""
+        with self._lock:
+            if len(self._samples) < 3:
+                return self.initial_timeout
+            samples = sorted(self._samples)
+            # Nearest-rank 95th percentile; with few samples that is the slowest
+            slowest = samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+        return min(self.max_timeout, max(self.min_timeout, slowest * 4))
+
+
+class AdaptiveWaiter:
+    """Event-driven waits for one driver with adaptive timeouts"""
+    def __init__(self, driver, tracker, poll_frequency=0.05):
+        self.driver = driver
+        self.tracker = tracker
+        self.poll_frequency = poll_frequency
+
+    def until(self, condition, timeout=None):
+        """WebDriverWait with a learned timeout and a short poll interval"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        start = time.perf_counter()
+        result = WebDriverWait(self.driver, timeout or self.tracker.timeout(),
+                               poll_frequency=self.poll_frequency).until(condition)
+        self.tracker.record(time.perf_counter() - start)
+        return result
+
+    def page_ready(self):
+        self.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+    def race_selectors(self, selectors, timeout=None):
+        """Wait until any selector shows text; return (selector, text)"""
+        index, text = self.until(
+            lambda d: d.execute_script(_RACE_SELECTORS_JS, list(selectors)), timeout)
+        return selectors[index], text
+
+    def wait_for_change(self, selector, old_text, old_url, timeout=None):
+        """Wait for the page to move on from old_text/old_url.
+
+        Raises TimeoutException if nothing changed in time.
+        """
+        from selenium.common import TimeoutException, WebDriverException
+        timeout = timeout or self.tracker.timeout()
+        start = time.perf_counter()
+        try:
+            self.driver.set_script_timeout(timeout)
+            self.driver.execute_async_script(_WAIT_FOR_CHANGE_JS, selector, old_text, old_url)
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            # A full navigation unloads the script before it can answer
+            if self.driver.current_url == old_url:
+                raise TimeoutException("Page did not change")
+        self.tracker.record(time.perf_counter() - start)
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.http_fetch import HttpFetchError, parse_summary_page
+from utils.scrape import NEXT_PAGE_ICON, SUMMARY_CONTENT_CLASSES, _scrape_pages_http
+from utils.scrape_checkpoint import ScrapeCheckpoint
+
+PAGE = """<html><body>
+<div class="MuiStack-root mui-style-mhauuz"><p>Page {number} text</p></div>
+{button}
+</body></html>"""
+ICON = '<svg><path d="M16.6141 11.2L9.4 4"></path></svg>'
+
+
+def page(number, button=""):
+    return PAGE.format(number=number, button=button)
+
+
+def parse(html):
+    return parse_summary_page(html, SUMMARY_CONTENT_CLASSES, NEXT_PAGE_ICON)
+
+
+def test_next_link_from_href_and_onclick():
+    assert parse(page(1, f'<a href="?page=2">{ICON}</a>')) == ("Page 1 text", "?page=2")
+    assert parse(page(1, f'<button onclick="location.href=\'?page=2\'">{ICON}</button>'))[1] == "?page=2"
+
+
+def test_last_page_has_no_next_link():
+    assert parse(page(3)) == ("Page 3 text", None)
+
+
+def test_script_only_next_button_needs_the_browser():
+    with pytest.raises(HttpFetchError):
+        parse(page(1, f'<button type="button">{ICON}</button>'))
+
+
+class StubSession:
+    cookies = {'session': 'x'}
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url):
+        return url, 200, self.pages[url]
+
+
+def test_http_scrape_keeps_the_checkpoint_for_the_browser(tmp_path):
+    book_url = "http://books.test/b/summary"
+    session = StubSession({
+        book_url: page(1, f'<a href="?page=2">{ICON}</a>'),
+        book_url + "?page=2": page(2, f'<button type="button">{ICON}</button>'),
+    })
+    checkpoint = ScrapeCheckpoint(book_url, tmp_path)
+    saved = []
+    with pytest.raises(HttpFetchError):
+        _scrape_pages_http(session, None, "a@b.c", "pw", book_url, checkpoint,
+                           saved.append, lambda url: None)
+    # Page 2 is read again by the browser, which can follow its button
+    assert saved == ["Page 1 text"]
+    assert ScrapeCheckpoint(book_url, tmp_path).last_page == 1
@@ -0,0 +1,46 @@
+import os
+import queue
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.ingest import ingest
+
+
+def drain(pages):
+    items = []
+    while True:
+        item = pages.get_nowait()
+        items.append(item)
+        if item is None:
+            return items
+
+
+def test_corrupt_epub_ends_the_stream_and_reports(tmp_path):
+    path = tmp_path / "broken.epub"
+    path.write_bytes(b"not a zip file")
+    pages, errors = queue.Queue(), []
+    ingest(path, pages, workers=0, on_error=errors.append)
+    assert drain(pages) == [None]
+    assert len(errors) == 1
+
+
+def test_error_without_handler_still_ends_the_stream(tmp_path):
+    path = tmp_path / "broken.epub"
+    path.write_bytes(b"not a zip file")
+    pages = queue.Queue()
+    with pytest.raises(Exception):
+        ingest(path, pages, workers=0)
+    assert drain(pages) == [None]
+
+
+def test_markdown_pieces_arrive_before_the_end(tmp_path):
+    path = tmp_path / "book.md"
+    path.write_text("# Title\n\nSome *text* here.\n", encoding='utf-8')
+    pages = queue.Queue()
+    ingest(path, pages)
+    items = drain(pages)
+    assert items[-1] is None
+    assert "Some text here." in "\n".join(items[:-1])
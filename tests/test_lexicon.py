@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.lexicon import UNKNOWN_ZIPF, Lexicon, build_lexicon, zipf_multiplier
+
+
+def expected_factor(lexicon, word):
+    if not word.strip('.,;:!?"'):
+        return 1.0
+    zipf = lexicon.zipf(word)
+    return zipf_multiplier(UNKNOWN_ZIPF if zipf is None else zipf)
+
+
+def make_lexicon(tmp_path):
+    rng = random.Random(3)
+    counts = {f"w{i:05d}": rng.randint(1, 100000) for i in range(5000)}
+    counts.update({"the": 10 ** 7, "café": 50, "zebra": 3})
+    build_lexicon(counts, tmp_path / "lexicon.bin")
+    return Lexicon(tmp_path / "lexicon.bin"), rng
+
+
+def test_few_words_gallop_to_the_same_factors_as_zipf(tmp_path):
+    lexicon, rng = make_lexicon(tmp_path)
+    # Sorted and unsorted hits, misses between, before and after all
+    # entries, case and punctuation variants, and a word with no letters
+    words = [f"w{rng.randrange(5000):05d}" for _ in range(40)]
+    words += ["The", "the.", "CAFÉ", "zebra!", "aardvark", "w00000", "w04999",
+              "w0250", "zzzz", "...", "w02500x"]
+    assert len(words) * 16 < len(lexicon)
+    factors = lexicon.multipliers(words)
+    assert set(factors) == set(words)
+    for word in words:
+        assert factors[word] == expected_factor(lexicon, word), word
+    assert factors["The"] == 1.0
+    assert factors["aardvark"] == zipf_multiplier(UNKNOWN_ZIPF)
+
+
+def test_many_words_match_the_few_words_path(tmp_path):
+    lexicon, rng = make_lexicon(tmp_path)
+    words = [f"w{rng.randrange(6000):05d}" for _ in range(1000)]
+    many = lexicon.multipliers(words)
+    for start in range(0, len(words), 50):
+        few = lexicon.multipliers(words[start:start + 50])
+        assert few == {word: many[word] for word in few}
+
+
+def test_missing_lexicon_keeps_the_pace(tmp_path):
+    lexicon = Lexicon(tmp_path / "missing.bin")
+    assert lexicon.multipliers(["rare", "words"]) == {"rare": 1.0, "words": 1.0}
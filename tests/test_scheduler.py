@@ -0,0 +1,114 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from controllers.scheduler import ReadingScheduler
+
+
+class Session:
+    """Steps every `interval` seconds; a step can be held open with `gate`"""
+    def __init__(self, interval=0.001, gate=None):
+        self.interval = interval
+        self.gate = gate
+        self.entered = threading.Event()
+        self.steps = 0
+        self.running = False
+
+    def step(self, now):
+        self.running = True
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.steps += 1
+        self.running = False
+        return now + self.interval
+
+
+def test_cancel_waits_for_a_running_step():
+    scheduler = ReadingScheduler()
+    gate = threading.Event()
+    session = Session(gate=gate)
+    scheduler.schedule(session)
+    assert session.entered.wait(5)
+    cancelled = threading.Event()
+
+    def cancel():
+        scheduler.cancel(session)
+        cancelled.set()
+
+    threading.Thread(target=cancel).start()
+    # The step is still inside step(), so cancel() has to wait
+    assert not cancelled.wait(0.1)
+    gate.set()
+    assert cancelled.wait(5)
+    assert not session.running
+    steps = session.steps
+    time.sleep(0.05)
+    # Nothing of the cancelled session ran afterwards, not even the step
+    # the running one returned
+    assert session.steps == steps == 1
+    assert not scheduler.is_scheduled(session)
+    scheduler.close()
+
+
+def test_sessions_step_in_deadline_order():
+    scheduler = ReadingScheduler()
+    order = []
+
+    class Once:
+        def __init__(self, name):
+            self.name = name
+
+        def step(self, now):
+            order.append(self.name)
+            return None
+
+    start = time.perf_counter()
+    for name, delay in (("late", 0.06), ("early", 0.02), ("middle", 0.04)):
+        scheduler.schedule(Once(name), start + delay)
+    give_up = time.perf_counter() + 5
+    while len(order) < 3 and time.perf_counter() < give_up:
+        time.sleep(0.01)
+    assert order == ["early", "middle", "late"]
+    assert len(scheduler) == 0
+    scheduler.close()
+
+
+def test_reschedule_replaces_the_pending_step():
+    scheduler = ReadingScheduler()
+    session = Session(interval=10.0)
+    scheduler.schedule(session, time.perf_counter() + 10.0)
+    scheduler.schedule(session)
+    assert session.entered.wait(5)
+    time.sleep(0.05)
+    # The step far in the future was replaced, not added
+    assert session.steps == 1
+    assert len(scheduler) == 1
+    scheduler.close()
+
+
+def test_cancel_gets_in_while_a_session_is_behind():
+    scheduler = ReadingScheduler()
+
+    class Behind:
+        steps = 0
+
+        def step(self, now):
+            self.steps += 1
+            # Always already due again, like a session catching up
+            return now - 1.0
+
+    session = Behind()
+    scheduler.schedule(session)
+    while session.steps < 100:
+        time.sleep(0.001)
+    done = threading.Event()
+    threading.Thread(target=lambda: (scheduler.cancel(session), done.set())).start()
+    assert done.wait(2)
+    steps = session.steps
+    time.sleep(0.02)
+    assert session.steps == steps
+    scheduler.close()
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.scrape_checkpoint import ScrapeCheckpoint
+
+BOOK_URL = "http://books.test/b/summary"
+
+
+def test_resume_from_the_last_saved_page(tmp_path):
+    checkpoint = ScrapeCheckpoint(BOOK_URL, tmp_path)
+    assert checkpoint.pages == 0 and checkpoint.last_url is None
+    assert checkpoint.append(1, BOOK_URL, "Page one")
+    assert checkpoint.append(2, BOOK_URL + "?page=2", "Page two")
+    # A page seen again after a retry is not saved twice
+    assert not checkpoint.append(2, BOOK_URL + "?page=2", "Page two")
+
+    resumed = ScrapeCheckpoint(BOOK_URL, tmp_path)
+    assert resumed.pages == 2
+    assert resumed.last_page == 2
+    assert resumed.last_url == BOOK_URL + "?page=2"
+    assert not resumed.append(1, BOOK_URL, "Page one")
+    assert resumed.append(3, BOOK_URL + "?page=3", "Page three")
+    assert list(resumed.iter_texts()) == ["Page one", "Page two", "Page three"]
+
+
+def test_torn_last_line_is_cut_off(tmp_path):
+    checkpoint = ScrapeCheckpoint(BOOK_URL, tmp_path)
+    checkpoint.append(1, BOOK_URL, "Page one")
+    with open(checkpoint.path, 'a', encoding='utf-8') as f:
+        f.write('{"page": 2, "url": "')
+    resumed = ScrapeCheckpoint(BOOK_URL, tmp_path)
+    assert resumed.last_page == 1
+    assert resumed.append(2, BOOK_URL + "?page=2", "Page two")
+    assert list(ScrapeCheckpoint(BOOK_URL, tmp_path).iter_texts()) == ["Page one", "Page two"]
+
+
+def test_write_book_and_remove(tmp_path):
+    checkpoint = ScrapeCheckpoint(BOOK_URL, tmp_path / "checkpoints")
+    checkpoint.append(1, BOOK_URL, "Page one")
+    checkpoint.append(2, BOOK_URL + "?page=2", "Page two")
+    output = tmp_path / "books" / "book.txt"
+    checkpoint.write_book(output)
+    assert output.read_text(encoding='utf-8') == "Page one\n\nPage two"
+    checkpoint.remove()
+    assert ScrapeCheckpoint(BOOK_URL, tmp_path / "checkpoints").pages == 0
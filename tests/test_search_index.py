@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.search_index import SearchIndex
+from utils.text_processor import TextProcessor
+
+TEXT = ("Speed reading is reading fast. Speedy readers read, and “Reading” "
+        "speeds up. Reading speed matters; speed reading again!")
+
+
+def index_of(text):
+    processor = TextProcessor()
+    processor.set_text(text)
+    return processor, SearchIndex.build(processor)
+
+
+def naive_find(words, query):
+    terms = [w.strip('.,;!“”').casefold() for w in words]
+    query = query.casefold().split()
+    return [i for i in range(len(terms) - len(query) + 1)
+            if all(terms[i + k] == q for k, q in enumerate(query))]
+
+
+def test_single_words_ignore_case_and_punctuation():
+    processor, index = index_of(TEXT)
+    words = list(processor.get_words())
+    assert list(index.find("reading")) == naive_find(words, "reading")
+    assert list(index.find("READING!")) == naive_find(words, "reading")
+    assert list(index.find("nothing")) == []
+    assert list(index.find("  ")) == []
+
+
+def test_phrases():
+    processor, index = index_of(TEXT)
+    words = list(processor.get_words())
+    for query in ("speed reading", "reading speed matters", "reading fast", "fast speed"):
+        assert list(index.find(query)) == naive_find(words, query)
+    assert list(index.find("speed reading")) == [0, 15]
+
+
+def test_prefixes():
+    processor, index = index_of(TEXT)
+    words = list(processor.get_words())
+    speed_words = [i for i, w in enumerate(words) if w.casefold().startswith("speed")]
+    assert list(index.find("speed*")) == speed_words
+    # A prefix inside a phrase
+    assert list(index.find("speed* read*")) == [0, 5, 15]
+    assert list(index.find("zz*")) == []
+
+
+def test_long_posting_lists_are_probed():
+    # A common word next to a rare one takes the binary search path
+    text = " ".join(["the"] * 500 + ["rare", "the"] + ["the"] * 20)
+    _, index = index_of(text)
+    assert list(index.find("rare the")) == [500]
+    assert list(index.find("the rare")) == [499]
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from controllers.scheduler import ReadingScheduler
+from controllers.speed_controller import SpeedController
+from utils.text_processor import TextProcessor
+
+
+def read_through(text, speed_ms):
+    processor = TextProcessor()
+    processor.set_text(text)
+    scheduler = ReadingScheduler()
+    frames = []
+    controller = SpeedController(processor, frames.append, scheduler)
+    controller.pace_mode = 'fixed'
+    controller.set_speed(speed_ms)
+    controller.start_reading()
+    give_up = time.perf_counter() + 10
+    while controller.is_running and time.perf_counter() < give_up:
+        time.sleep(0.01)
+    scheduler.close()
+    return controller, frames
+
+
+def test_achieved_wpm_counts_intervals_between_frames():
+    controller, frames = read_through(" ".join(["word"] * 41), 10)
+    assert len(frames) == 41
+    stats = controller.get_pace_stats()
+    assert stats['words_shown'] == 41
+    # 40 intervals of 10 ms; counting the first word too would report ~6150
+    assert abs(stats['achieved_wpm'] - 6000) < 120
+
+
+def test_single_frame_has_no_pace():
+    controller, frames = read_through("alone", 10)
+    assert frames == ["alone"]
+    assert controller.get_pace_stats()['achieved_wpm'] == 0.0
@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.search_index import SearchIndex
+from utils.text_processor import TextProcessor
+
+# Non-breaking, em, ideographic and other spaces that str's \s splits on
+TEXT = ("Hello\u00a0world. Foo\u2003bar\u3000baz!\n\n"
+        "Caf\u00e9 au\u202flait \u201cquoted\u201d end.\u2029 \n\u00a0\nLast one")
+
+
+def tokenize_file(path, block_size=None):
+    processor = TextProcessor()
+    if block_size:
+        # Tiny blocks put block ends inside multi-byte characters
+        processor.BLOCK_SIZE = block_size
+    processor.stream_text(path)
+    processor.wait_until_complete()
+    return processor
+
+
+def test_str_and_file_tokenize_alike(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_text(TEXT, encoding='utf-8')
+    expected = TextProcessor()
+    expected.set_text(TEXT)
+    assert expected.word_count() == 12
+    for block_size in (None, 5):
+        processor = tokenize_file(path, block_size)
+        assert list(processor.get_words()) == list(expected.get_words())
+        assert [processor.word(i) for i in range(processor.word_count())] == list(expected.get_words())
+        assert list(processor.get_index()[1]) == list(expected.get_index()[1])
+        assert list(processor.get_index()[2]) == list(expected.get_index()[2])
+        assert SearchIndex.build(processor).terms == SearchIndex.build(expected).terms
+
+
+def assert_same_tokens(processor, expected):
+    assert list(processor.get_words()) == list(expected.get_words())
+    for mine, theirs in zip(processor.get_index(), expected.get_index()):
+        assert list(mine) == list(theirs)
+
+
+def test_apply_edit_matches_set_text():
+    rng = random.Random(7)
+    pieces = ["word", "Two", " ", "  ", "\n", "\n\n", ". ", "! ", "end.", " ", "“q” "]
+    text = "First words. Then more\n\nA new paragraph here."
+    processor = TextProcessor()
+    processor.set_text(text)
+    for _ in range(300):
+        offset = rng.randint(0, len(text))
+        removed = rng.randint(0, min(6, len(text) - offset))
+        inserted = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+        old_count = processor.word_count()
+        change = processor.apply_edit(offset, removed, inserted)
+        text = text[:offset] + inserted + text[offset + removed:]
+        expected = TextProcessor()
+        expected.set_text(text)
+        first, old_words, new_words = change
+        assert processor.word_count() - old_count == new_words - old_words
+        assert_same_tokens(processor, expected)
+
+
+def test_apply_edit_needs_a_full_text(tmp_path):
+    path = tmp_path / "book.txt"
+    path.write_text(TEXT, encoding='utf-8')
+    processor = tokenize_file(path)
+    assert processor.apply_edit(0, 0, "x") is None
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.waits import LatencyTracker
+
+
+def tracker_with(latencies):
+    tracker = LatencyTracker(min_timeout=0.0, max_timeout=1000.0)
+    for seconds in latencies:
+        tracker.record(seconds)
+    return tracker
+
+
+def test_few_samples_use_the_slowest():
+    # int(3 * 0.95) - 1 picked the median here
+    assert tracker_with([1.0, 2.0, 5.0]).timeout() == 20.0
+
+
+def test_timeout_follows_the_95th_percentile():
+    latencies = [float(i) for i in range(1, 21)]
+    assert tracker_with(latencies).timeout() == 19.0 * 4
+    assert tracker_with(latencies + [100.0] * 2).timeout() == 400.0
+
+
+def test_initial_timeout_until_three_samples():
+    assert tracker_with([1.0, 2.0]).timeout() == 15.0